@@ -11,8 +11,7 @@ from django.contrib.contenttypes import generic
 import modeltranslation.models  # NOQA
 from modeltranslation.settings import DEFAULT_LANGUAGE
 from modeltranslation.translator import translator
-from modeltranslation.utils import (get_translation_fields,
-                                    build_css_class)
+from modeltranslation.utils import build_css_class, resolve_language
 
 
 class TranslationBaseModelAdmin(BaseModelAdmin):
@@ -64,7 +63,12 @@ class TranslationBaseModelAdmin(BaseModelAdmin):
             css_classes.append(
                 build_css_class(db_field.name, 'mt-field'))
 
-            if db_field.language == DEFAULT_LANGUAGE:
+            # The translation field holding the value in the default language,
+            # which is another one if the field isn't translated into it
+            default_lang = resolve_language(
+                DEFAULT_LANGUAGE, self.trans_opts.field_languages[orig_fieldname],
+                getattr(self.trans_opts, 'fallback_languages', None))
+            if db_field.language == default_lang:
                 # Add another css class to identify a default modeltranslation
                 # widget.
                 css_classes.append('mt-default')
@@ -97,7 +101,7 @@ class TranslationBaseModelAdmin(BaseModelAdmin):
 
         >>> print self.trans_opts.fields
         ('title',)
-        >>> get_translation_fields(self.trans_opts.fields[0])
+        >>> self.trans_opts.localized_fieldnames['title']
         ['title_de', 'title_en']
         >>> self.replace_orig_field(['title', 'url'])
         ['title_de', 'title_en', 'url']
@@ -108,7 +112,7 @@ class TranslationBaseModelAdmin(BaseModelAdmin):
             for opt in option:
                 if opt in self.trans_opts.fields:
                     index = option_new.index(opt)
-                    translation_fields = get_translation_fields(opt)
+                    translation_fields = self.trans_opts.localized_fieldnames[opt]
                     option_new[index:index + 1] = translation_fields
             option = option_new
         return option
@@ -128,7 +132,7 @@ class TranslationBaseModelAdmin(BaseModelAdmin):
             prepopulated_fields_new = dict(self.prepopulated_fields)
             for (k, v) in self.prepopulated_fields.items():
                 if v[0] in self.trans_opts.fields:
-                    translation_fields = get_translation_fields(v[0])
+                    translation_fields = self.trans_opts.localized_fieldnames[v[0]]
                     prepopulated_fields_new[k] = tuple([translation_fields[0]])
             self.prepopulated_fields = prepopulated_fields_new
 
@@ -205,7 +209,7 @@ class TranslationAdmin(TranslationBaseModelAdmin, admin.ModelAdmin):
                 if field in self.trans_opts.fields:
                     index = editable_new.index(field)
                     display_index = display_new.index(field)
-                    translation_fields = get_translation_fields(field)
+                    translation_fields = self.trans_opts.localized_fieldnames[field]
                     editable_new[index:index + 1] = translation_fields
                     display_new[display_index:display_index + 1] = \
                         translation_fields
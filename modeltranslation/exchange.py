@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Writers and readers of the file formats used to exchange translations with
+translators.
+
+Every entry is identified by ``<app_label>.<model>.<field>.<pk>``, e.g.
+``news.news.title.42``, and carries the value of the field in the source and
+in the target language.
+"""
+import csv
+import re
+from xml.sax.saxutils import escape, quoteattr
+try:
+    from xml.etree import cElementTree as ElementTree
+except ImportError:
+    from xml.etree import ElementTree
+
+FORMATS = ('po', 'xliff', 'csv')
+XLIFF_NAMESPACE = '{urn:oasis:names:tc:xliff:document:1.2}'
+
+
+def build_entry_id(model_full_name, field_name, pk):
+    return u'%s.%s.%s' % (model_full_name, field_name, pk)
+
+
+def parse_entry_id(entry_id):
+    """
+    Returns the ``(model_full_name, field_name, pk)`` of an entry id.
+    """
+    app_label, module_name, field_name, pk = entry_id.split('.', 3)
+    return '%s.%s' % (app_label, module_name), field_name, pk
+
+
+class TranslationWriter(object):
+    """
+    Writes the entries to ``stream`` as soon as they are passed, so exports
+    of any size use constant memory.
+    """
+    def __init__(self, stream, source_language, target_language):
+        self.stream = stream
+        self.source_language = source_language
+        self.target_language = target_language
+
+    def write_header(self):
+        pass
+
+    def start_model(self, model_full_name):
+        pass
+
+    def write(self, entry_id, source, target):
+        raise NotImplementedError
+
+    def end_model(self):
+        pass
+
+    def write_footer(self):
+        pass
+
+    def out(self, text):
+        self.stream.write(text.encode('utf-8'))
+
+
+def po_quote(value):
+    return u'"%s"' % value.replace('\\', '\\\\').replace('"', '\\"').replace(
+        '\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
+
+
+PO_ESCAPES = {'n': '\n', 'r': '\r', 't': '\t'}
+
+
+def po_unquote(value):
+    return re.sub(r'\\(.)', lambda match: PO_ESCAPES.get(match.group(1), match.group(1)),
+                  value.strip()[1:-1])
+
+
+class POWriter(TranslationWriter):
+    """
+    Gettext PO file, with the entry ids as message contexts.
+    """
+    def write_header(self):
+        self.out(u'msgid ""\nmsgstr ""\n'
+                 u'"Content-Type: text/plain; charset=UTF-8\\n"\n'
+                 u'"Language: %s\\n"\n'
+                 u'"X-Source-Language: %s\\n"\n' % (
+                     self.target_language, self.source_language))
+
+    def write(self, entry_id, source, target):
+        self.out(u'\nmsgctxt %s\nmsgid %s\nmsgstr %s\n' % (
+            po_quote(entry_id), po_quote(source), po_quote(target or u'')))
+
+
+class XLIFFWriter(TranslationWriter):
+    """
+    XLIFF 1.2 document, with a ``<file>`` per model.
+    """
+    def write_header(self):
+        self.out(u'<?xml version="1.0" encoding="utf-8"?>\n'
+                 u'<xliff version="1.2" '
+                 u'xmlns="urn:oasis:names:tc:xliff:document:1.2">\n')
+
+    def start_model(self, model_full_name):
+        self.out(u'  <file original=%s source-language=%s target-language=%s '
+                 u'datatype="plaintext">\n    <body>\n' % (
+                     quoteattr(model_full_name),
+                     quoteattr(self.source_language),
+                     quoteattr(self.target_language)))
+
+    def write(self, entry_id, source, target):
+        self.out(u'      <trans-unit id=%s>\n'
+                 u'        <source>%s</source>\n'
+                 u'        <target>%s</target>\n'
+                 u'      </trans-unit>\n' % (
+                     quoteattr(entry_id), escape(source), escape(target or u'')))
+
+    def end_model(self):
+        self.out(u'    </body>\n  </file>\n')
+
+    def write_footer(self):
+        self.out(u'</xliff>\n')
+
+
+class CSVWriter(TranslationWriter):
+    """
+    CSV file with the entry id and the source and target values, under a
+    header row naming the languages.
+    """
+    def __init__(self, stream, source_language, target_language):
+        super(CSVWriter, self).__init__(stream, source_language, target_language)
+        self.writer = csv.writer(stream)
+
+    def write_header(self):
+        self.writer.writerow(['id', self.source_language, self.target_language])
+
+    def write(self, entry_id, source, target):
+        self.writer.writerow([value.encode('utf-8')
+                              for value in (entry_id, source, target or u'')])
+
+
+WRITERS = {'po': POWriter, 'xliff': XLIFFWriter, 'csv': CSVWriter}
+
+
+# The readers are generators yielding an ``(entry_id, source, target,
+# target_language)`` tuple per entry while reading the stream, so imports of
+# any size use constant memory.
+
+def lines_and_end(stream):
+    """
+    Yields the lines of ``stream`` followed by an empty line.
+    """
+    for line in stream:
+        yield line
+    yield ''
+
+
+def read_po(stream):
+    language = None
+    entry = {}
+    keyword = None
+    for line in lines_and_end(stream):
+        line = line.decode('utf-8').strip()
+        if line.startswith('"') and keyword is not None:
+            entry[keyword] += po_unquote(line)
+            continue
+        if line.startswith('#') or (line and not line.startswith('msg')):
+            continue
+        if line:
+            keyword, value = line.split(None, 1)
+        # An entry ends with the next entry or the end of the file
+        if 'msgstr' in entry and (not line or keyword in ('msgctxt', 'msgid')):
+            if entry.get('msgid'):
+                if 'msgctxt' in entry:
+                    yield (entry['msgctxt'], entry['msgid'], entry['msgstr'],
+                           language)
+            else:
+                # Header
+                match = re.search(r'^Language: *(\S+)', entry['msgstr'], re.M)
+                if match:
+                    language = match.group(1)
+            entry = {}
+        if line:
+            entry[keyword] = po_unquote(value)
+        else:
+            keyword = None
+
+
+def read_xliff(stream):
+    language = None
+    for event, element in ElementTree.iterparse(stream, events=('start', 'end')):
+        if event == 'start' and element.tag == XLIFF_NAMESPACE + 'file':
+            language = element.get('target-language')
+        elif event == 'end' and element.tag == XLIFF_NAMESPACE + 'trans-unit':
+            yield (unicode(element.get('id')),
+                   unicode(element.findtext(XLIFF_NAMESPACE + 'source') or u''),
+                   unicode(element.findtext(XLIFF_NAMESPACE + 'target') or u''),
+                   language)
+            element.clear()
+
+
+def read_csv(stream):
+    reader = csv.reader(stream)
+    language = reader.next()[2].decode('utf-8')
+    for row in reader:
+        if row:
+            entry_id, source, target = [value.decode('utf-8') for value in row[:3]]
+            yield entry_id, source, target, language
+
+
+READERS = {'po': read_po, 'xliff': read_xliff, 'csv': read_csv}
+EXTENSIONS = {'.po': 'po', '.xlf': 'xliff', '.xliff': 'xliff', '.csv': 'csv'}
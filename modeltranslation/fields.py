@@ -1,12 +1,17 @@
 # -*- coding: utf-8 -*-
-from django.core.exceptions import ImproperlyConfigured
+import base64
+import zlib
+
+from django.core.exceptions import FieldError, ImproperlyConfigured
 from django.db.models import fields
 
 from modeltranslation import settings as mt_settings
 from modeltranslation.utils import (get_language,
                                     build_localized_fieldname,
                                     build_localized_verbose_name,
-                                    resolution_order)
+                                    resolution_order,
+                                    resolve_language,
+                                    unique)
 
 
 SUPPORTED_FIELDS = (
@@ -21,8 +26,55 @@ SUPPORTED_FIELDS = (
     fields.files.ImageField,
 )
 
+# Attributes of the original field which don't depend on the language and are
+# rarely accessed. Instead of being copied to every translation field they are
+# looked up on the original field.
+SHARED_ATTRIBUTES = frozenset([
+    'validators',
+    'error_messages',
+    '_choices',
+    'help_text',
+    'unique_for_date',
+    'unique_for_month',
+    'unique_for_year',
+    'db_tablespace',
+    'storage',
+    'upload_to',
+    'width_field',
+    'height_field',
+])
+
+
+# Prefix of compressed values stored in the database
+COMPRESSED_PREFIX = 'zlib:'
+
+
+def compress(value):
+    """
+    Returns the compressed representation of a text value stored in the
+    database. Empty and already compressed values are returned unchanged.
+    """
+    if not value or value.startswith(COMPRESSED_PREFIX):
+        return value
+    return COMPRESSED_PREFIX + base64.b64encode(zlib.compress(value.encode('utf-8')))
+
 
-def create_translation_field(model, field_name, lang):
+def decompress(value):
+    """
+    Returns the text value of a compressed value. Values which aren't
+    compressed (e.g. stored before the field was compressed) are returned
+    unchanged.
+    """
+    if not value or not value.startswith(COMPRESSED_PREFIX):
+        return value
+    try:
+        return zlib.decompress(
+            base64.b64decode(value[len(COMPRESSED_PREFIX):])).decode('utf-8')
+    except (TypeError, ValueError, zlib.error):
+        return value
+
+
+def create_translation_field(model, field_name, lang, compressed=False):
     """
     Translation field factory. Returns a ``TranslationField`` based on a
     fieldname and a language.
@@ -34,6 +86,9 @@ def create_translation_field(model, field_name, lang):
 
     If the class is neither a subclass of fields in ``SUPPORTED_FIELDS``, nor
     in ``CUSTOM_FIELDS`` an ``ImproperlyConfigured`` exception will be raised.
+
+    If ``compressed`` is true the field stores its values compressed (only
+    supported for ``TextField``).
     """
     field = model._meta.get_field(field_name)
     cls_name = field.__class__.__name__
@@ -41,18 +96,40 @@ def create_translation_field(model, field_name, lang):
             cls_name in mt_settings.CUSTOM_FIELDS):
         raise ImproperlyConfigured(
             '%s is not supported by modeltranslation.' % cls_name)
-    translation_class = field_factory(field.__class__)
+    if compressed and not isinstance(field, fields.TextField):
+        raise ImproperlyConfigured(
+            'Compression is only supported for TextField, not %s.' % cls_name)
+    translation_class = field_factory(field.__class__, compressed)
     return translation_class(translated_field=field, language=lang)
 
 
-def field_factory(baseclass):
-    class TranslationFieldSpecific(TranslationField, baseclass):
-        pass
+_field_classes = {}
+
+
+def field_factory(baseclass, compressed=False):
+    """
+    Returns a ``TranslationField`` subclass for the given field class (which
+    compresses its values if ``compressed`` is true).
+
+    The subclass is created once per ``baseclass`` and shared by all
+    translation fields based on it.
+    """
+    key = (baseclass, compressed)
+    if key not in _field_classes:
+        if compressed:
+            class TranslationFieldSpecific(CompressedTranslationField,
+                                           TranslationField, baseclass):
+                pass
+        else:
+            class TranslationFieldSpecific(TranslationField, baseclass):
+                pass
 
-    # Reflect baseclass name of returned subclass
-    TranslationFieldSpecific.__name__ = 'Translation%s' % baseclass.__name__
+        # Reflect baseclass name of returned subclass
+        TranslationFieldSpecific.__name__ = '%sTranslation%s' % (
+            compressed and 'Compressed' or '', baseclass.__name__)
 
-    return TranslationFieldSpecific
+        _field_classes[key] = TranslationFieldSpecific
+    return _field_classes[key]
 
 
 class TranslationField(object):
@@ -62,7 +139,7 @@ class TranslationField(object):
 
     For every field defined in the model's ``TranslationOptions`` localized
     versions of that field are added to the model depending on the languages
-    given in ``settings.LANGUAGES``.
+    given in ``settings.LANGUAGES`` (or the ``languages`` translation option).
 
     If for example there is a model ``News`` with a field ``title`` which is
     registered for translation and the ``settings.LANGUAGES`` contains the
@@ -74,9 +151,11 @@ class TranslationField(object):
     that needs to be specified when the field is created.
     """
     def __init__(self, translated_field, language, *args, **kwargs):
-        # Update the dict of this field with the content of the original one
-        # This might be a bit radical?! Seems to work though...
-        self.__dict__.update(translated_field.__dict__)
+        # Update the dict of this field with the content of the original one,
+        # except for the attributes which are shared (see ``__getattr__``).
+        for name, value in translated_field.__dict__.iteritems():
+            if name not in SHARED_ATTRIBUTES:
+                self.__dict__[name] = value
 
         # Store the originally wrapped field for later
         self.translated_field = translated_field
@@ -101,6 +180,14 @@ class TranslationField(object):
         self.verbose_name = build_localized_verbose_name(
             translated_field.verbose_name, language)
 
+    def __getattr__(self, name):
+        """
+        Looks up the shared attributes on the original field.
+        """
+        if name in SHARED_ATTRIBUTES:
+            return getattr(self.translated_field, name)
+        raise AttributeError(name)
+
     def south_field_triple(self):
         """
         Returns a suitable description of this field for South.
@@ -114,22 +201,94 @@ class TranslationField(object):
         return (field_class, args, kwargs)
 
 
+class CompressedTranslationField(object):
+    """
+    Mixin for translation fields which store their values compressed.
+
+    The values are compressed when saving and stay compressed on loaded
+    instances until they are read (see ``CompressedValueDescriptor``).
+    Only exact lookups work on compressed values, other lookups raise a
+    ``FieldError``.
+    """
+    compressed = True
+    lookup_types = ('exact', 'in', 'isnull')
+
+    def pre_save(self, model_instance, add):
+        # Don't decompress values which weren't read
+        if self.attname in model_instance.__dict__:
+            return model_instance.__dict__[self.attname]
+        return super(CompressedTranslationField, self).pre_save(
+            model_instance, add)
+
+    def get_prep_value(self, value):
+        return compress(super(CompressedTranslationField, self).get_prep_value(value))
+
+    def get_prep_lookup(self, lookup_type, value):
+        # Patterns and ranges would be compared with the compressed values
+        if lookup_type not in self.lookup_types:
+            raise FieldError(
+                "Lookup type '%s' isn't supported on compressed field '%s'." % (
+                    lookup_type, self.name))
+        return super(CompressedTranslationField, self).get_prep_lookup(
+            lookup_type, value)
+
+
+class CompressedValueDescriptor(object):
+    """
+    A descriptor storing the value of a compressed translation field like a
+    plain attribute, which decompresses it on first access.
+    """
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        try:
+            value = instance.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name)
+        if value and value.startswith(COMPRESSED_PREFIX):
+            value = instance.__dict__[self.name] = decompress(value)
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.name] = value
+
+
 class TranslationFieldDescriptor(object):
     """
     A descriptor used for the original translated field.
     """
-    def __init__(self, field, fallback_value=None, fallback_languages=None):
+    def __init__(self, field, fallback_value=None, fallback_languages=None,
+                 languages=None):
         """
         The ``name`` is the name of the field (which is not available in the
         descriptor by default - this is Python behaviour).
+
+        The ``languages`` are the languages the field is translated into
+        (defaults to all available languages).
         """
         self.field = field
         self.fallback_value = fallback_value
         self.fallback_languages = fallback_languages
+        if languages is None:
+            languages = mt_settings.AVAILABLE_LANGUAGES
+        self.languages = tuple(languages)
 
     def __set__(self, instance, value):
-        lang = get_language()
+        cur_lang = get_language()
+        lang = resolve_language(cur_lang, self.languages, self.fallback_languages)
         loc_field_name = build_localized_fieldname(self.field.name, lang)
+        if lang != cur_lang and loc_field_name in instance.__dict__:
+            # The field isn't translated into the current language, don't
+            # overwrite the value of the language holding it instead
+            old_value = getattr(instance, loc_field_name)
+            if old_value is not None and old_value != '' and old_value != value:
+                raise ValueError(
+                    "Translation field '%s' isn't translated into '%s', setting "
+                    "it would overwrite '%s'." % (
+                        self.field.name, cur_lang, loc_field_name))
         # also update the translation field of the current language
         setattr(instance, loc_field_name, value)
 
@@ -138,14 +297,108 @@ class TranslationFieldDescriptor(object):
             raise ValueError(
                 "Translation field '%s' can only be accessed via an instance "
                 "not via a class." % self.field.name)
-        langs = resolution_order(get_language(), self.fallback_languages)
-        for lang in langs:
+        return self.get_value(instance, get_language())
+
+    def get_value(self, instance, lang, default=True):
+        """
+        Returns the value of the field in language ``lang``, i.e. the value
+        of the first filled translation field of ``get_languages(lang)``.
+
+        If no translation field is filled, ``get_default()`` is returned or
+        ``None`` if ``default`` is false.
+        """
+        for lang in self.get_languages(lang):
             loc_field_name = build_localized_fieldname(self.field.name, lang)
             val = getattr(instance, loc_field_name, None)
             # Here we check only for None and '', because e.g. 0 should not fall back.
             if val is not None and val != '':
                 return val
+        if default:
+            return self.get_default()
+        return None
+
+    def get_languages(self, lang):
+        """
+        Returns the languages whose translation fields are checked for the
+        value of the field in language ``lang``, in order.
+        """
+        langs = resolution_order(lang, self.fallback_languages)
+        if lang not in self.languages:
+            # The field is not translated into the language, so start with
+            # the language which stores its value instead.
+            langs = tuple(unique(
+                (resolve_language(lang, self.languages, self.fallback_languages),) +
+                langs))
+        return langs
+
+    def get_default(self):
+        """
+        Returns the value of the field if no translation field is filled.
+        """
         if self.fallback_value is None:
             return self.field.get_default()
         else:
             return self.fallback_value
+
+
+class EffectiveFieldDescriptor(TranslationFieldDescriptor):
+    """
+    A descriptor used for the original translated field if its effective
+    values (the values resulting from the fallback languages) are
+    materialized in additional fields.
+
+    The materialized value of the current language is returned unless a
+    translation field was changed since the effective fields were set (i.e.
+    loaded or computed on save).
+    """
+    def __init__(self, field, effective_fieldnames, **kwargs):
+        """
+        The ``effective_fieldnames`` map languages to the names of the fields
+        storing the effective value in these languages.
+        """
+        super(EffectiveFieldDescriptor, self).__init__(field, **kwargs)
+        self.effective_fieldnames = effective_fieldnames
+        self.state_key = build_effective_state_key(field.name)
+
+    def __get__(self, instance, owner):
+        if not instance:
+            raise ValueError(
+                "Translation field '%s' can only be accessed via an instance "
+                "not via a class." % self.field.name)
+        lang = get_language()
+        if instance.__dict__.get(self.state_key) and lang in self.effective_fieldnames:
+            val = instance.__dict__.get(self.effective_fieldnames[lang])
+            # None means no translation field is filled (or the value hasn't
+            # been materialized yet)
+            if val is not None:
+                return val
+        return self.get_value(instance, lang)
+
+
+class EffectiveStateDescriptor(object):
+    """
+    A descriptor storing the value of a translation or effective field like a
+    plain attribute, which also marks the effective values of the translated
+    field as outdated (when a translation field is set) or up to date (when
+    an effective field is set).
+    """
+    def __init__(self, name, state_key, valid):
+        self.name = name
+        self.state_key = state_key
+        self.valid = valid
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name)
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.name] = value
+        instance.__dict__[self.state_key] = self.valid
+
+
+def build_effective_state_key(field_name):
+    return '_%s_effective_valid' % field_name
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Export the translation fields of the registered models to a PO, XLIFF or CSV
+file for translators.
+
+The rows are streamed in primary key order in batches which only contain the
+primary key and the source and target language columns, and every entry is
+written to the file right away, so memory use doesn't depend on table size.
+"""
+import sys
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, router
+from django.db.models import CharField, Q, TextField
+from django.db.models.query import QuerySet
+from django.utils.encoding import force_unicode
+
+from modeltranslation import settings as mt_settings
+from modeltranslation.exchange import FORMATS, WRITERS, build_entry_id
+from modeltranslation.fields import decompress
+from modeltranslation.management.commands.update_translation_fields import (
+    get_translated_models)
+from modeltranslation.utils import build_localized_fieldname
+
+
+class Command(BaseCommand):
+    help = ('Exports the translation fields of all or the specified '
+            'translated applications or models for translators.')
+    args = '[app_label[.ModelName] ...]'
+    option_list = BaseCommand.option_list + (
+        make_option('--target-language', dest='target_language',
+                    help='Language to translate into (required).'),
+        make_option('--source-language', dest='source_language',
+                    default=mt_settings.DEFAULT_LANGUAGE,
+                    help='Language to translate from. Defaults to the default '
+                         'language.'),
+        make_option('--format', dest='format', default='po',
+                    help='Output format: %s. Defaults to po.' % (
+                        ', '.join(FORMATS))),
+        make_option('--output', dest='output', default=None,
+                    help='File to write to. Defaults to the standard output.'),
+        make_option('--missing-only', action='store_true', dest='missing_only',
+                    default=False,
+                    help='Only export entries not yet translated into the '
+                         'target language.'),
+        make_option('--batch-size', dest='batch_size', type='int',
+                    default=1000,
+                    help='Number of rows fetched per query. Defaults to 1000.'),
+        make_option('--database', action='store', dest='database',
+                    default=DEFAULT_DB_ALIAS,
+                    help='Nominates a database to export from. Defaults to '
+                         'the "default" database.'),
+    )
+
+    def handle(self, *args, **options):
+        source_language = options.get('source_language',
+                                      mt_settings.DEFAULT_LANGUAGE)
+        target_language = options.get('target_language')
+        output_format = options.get('format', 'po')
+        output_file = options.get('output')
+        self.missing_only = options.get('missing_only', False)
+        self.batch_size = options.get('batch_size', 1000)
+        self.database = options.get('database', DEFAULT_DB_ALIAS)
+        if output_format not in FORMATS:
+            raise CommandError('Unknown format: %s' % output_format)
+        for lang in (source_language, target_language):
+            if lang not in mt_settings.AVAILABLE_LANGUAGES:
+                raise CommandError('Unknown language: %s' % lang)
+        if source_language == target_language:
+            raise CommandError('The source and target languages are the same')
+
+        if output_file:
+            stream = open(output_file, 'wb')
+        else:
+            stream = sys.stdout
+        try:
+            writer = WRITERS[output_format](
+                stream, source_language, target_language)
+            writer.write_header()
+            for model, trans_opts in sorted(
+                    get_translated_models(args),
+                    key=lambda item: item[0]._meta.db_table):
+                if (model._meta.abstract or
+                        not router.allow_syncdb(self.database, model)):
+                    continue
+                self.export_model(writer, model, trans_opts)
+            writer.write_footer()
+        finally:
+            if output_file:
+                stream.close()
+
+    def get_exported_fields(self, model, trans_opts, languages):
+        """
+        Returns the local text fields of ``model`` which are translated into
+        all of the given languages (other fields aren't of any use to
+        translators).
+
+        Fields inherited from a parent model are exported with the parent.
+        """
+        local_fields = model._meta.local_fields
+        exported_fields = []
+        for field_name in trans_opts.fields:
+            field = model._meta.get_field(field_name)
+            if (field in local_fields and
+                    isinstance(field, (CharField, TextField)) and
+                    all(lang in trans_opts.field_languages[field_name]
+                        for lang in languages)):
+                exported_fields.append(field_name)
+        return exported_fields
+
+    def export_model(self, writer, model, trans_opts):
+        """
+        Writes the entries of ``model`` using keyset pagination on the
+        primary key.
+        """
+        languages = (writer.source_language, writer.target_language)
+        field_names = self.get_exported_fields(model, trans_opts, languages)
+        if not field_names:
+            return
+        # (field name, source field, target field)
+        columns = [
+            (field_name,) + tuple(model._meta.get_field(
+                build_localized_fieldname(field_name, lang)) for lang in languages)
+            for field_name in field_names]
+        # The default manager may filter out rows
+        queryset = QuerySet(model, using=self.database).order_by('pk')
+        if self.missing_only:
+            missing = Q()
+            for field_name, source_field, target_field in columns:
+                missing |= Q(**{target_field.name: None}) | Q(**{target_field.name: ''})
+            queryset = queryset.filter(missing)
+        queryset = queryset.values_list('pk', *[
+            f.name for column in columns for f in column[1:]])
+
+        model_full_name = '%s.%s' % (model._meta.app_label,
+                                     model._meta.module_name)
+        writer.start_model(model_full_name)
+        last_pk = None
+        while True:
+            batch = queryset
+            if last_pk is not None:
+                batch = batch.filter(pk__gt=last_pk)
+            rows = list(batch[:self.batch_size])
+            for row in rows:
+                for i, (field_name, source_field, target_field) in enumerate(columns):
+                    source = self.get_value(source_field, row[1 + 2 * i])
+                    target = self.get_value(target_field, row[2 + 2 * i])
+                    # Nothing to translate, or already translated
+                    if not source or (self.missing_only and target):
+                        continue
+                    writer.write(build_entry_id(model_full_name, field_name, row[0]),
+                                 source, target)
+            if len(rows) < self.batch_size:
+                break
+            last_pk = rows[-1][0]
+        writer.end_model()
+
+    def get_value(self, field, value):
+        if value is None:
+            return u''
+        if getattr(field, 'compressed', False):
+            value = decompress(value)
+        return force_unicode(value)
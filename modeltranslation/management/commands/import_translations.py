@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+Import the translations returned by translators in a PO, XLIFF or CSV file
+(see the ``export_translations`` command).
+
+The file is read as a stream. The entries are collected per model and written
+in batches, each one using a single ``UPDATE`` which only sets the affected
+translation columns with a ``CASE`` expression over the primary keys. Model
+instances aren't created nor saved.
+"""
+from __future__ import with_statement  # Python 2.5 compatibility
+import os
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import CharField, TextField, get_model
+from django.db.models.query import QuerySet
+from django.utils.datastructures import SortedDict
+
+from modeltranslation.exchange import EXTENSIONS, FORMATS, READERS, parse_entry_id
+from modeltranslation.fields import decompress
+from modeltranslation.manager import MAX_SQLITE_PARAMS, get_derived_update_sql
+from modeltranslation.translator import translator
+from modeltranslation.utils import build_localized_fieldname
+
+
+class Command(BaseCommand):
+    help = ('Imports translations from a PO, XLIFF or CSV file created by '
+            'export_translations.')
+    args = '<file>'
+    option_list = BaseCommand.option_list + (
+        make_option('--format', dest='format', default=None,
+                    help='Input format: %s. Defaults to the one matching the '
+                         'file extension.' % ', '.join(FORMATS)),
+        make_option('--target-language', dest='target_language', default=None,
+                    help='Language of the translations. Defaults to the one '
+                         'named in the file.'),
+        make_option('--batch-size', dest='batch_size', type='int',
+                    default=1000,
+                    help='Number of entries written per UPDATE. Defaults to '
+                         '1000.'),
+        make_option('--dry-run', action='store_true', dest='dry_run',
+                    default=False,
+                    help='Only print a summary of the changes, do not write '
+                         'them.'),
+        make_option('--database', action='store', dest='database',
+                    default=DEFAULT_DB_ALIAS,
+                    help='Nominates a database to import into. Defaults to '
+                         'the "default" database.'),
+    )
+
+    def handle(self, *args, **options):
+        if len(args) != 1:
+            raise CommandError('Enter the file to import.')
+        input_format = options.get('format')
+        if input_format is None:
+            input_format = EXTENSIONS.get(os.path.splitext(args[0])[1].lower())
+        if input_format not in FORMATS:
+            raise CommandError('Unknown format, use --format.')
+        target_language = options.get('target_language')
+        self.batch_size = options.get('batch_size', 1000)
+        self.dry_run = options.get('dry_run', False)
+        self.database = options.get('database', DEFAULT_DB_ALIAS)
+        # (model full name, field name, language) -> [new, changed, unchanged]
+        self.stats = {}
+        self.skipped = 0
+        # model -> list of (pk, translation field, value)
+        pending = {}
+
+        stream = open(args[0], 'rb')
+        try:
+            for entry_id, source, target, language in READERS[input_format](stream):
+                if target_language is not None:
+                    language = target_language
+                # Not translated yet
+                if not target:
+                    continue
+                entry = self.resolve_entry(entry_id, language)
+                if entry is None:
+                    self.skipped += 1
+                    continue
+                model, pk, field = entry
+                batch = pending.setdefault(model, [])
+                batch.append((pk, field, target))
+                if len(batch) >= self.batch_size:
+                    self.import_batch(model, pending.pop(model))
+            for model, batch in pending.items():
+                self.import_batch(model, batch)
+        finally:
+            stream.close()
+        self.print_summary()
+
+    def resolve_entry(self, entry_id, language):
+        """
+        Returns the ``(model, pk, translation field)`` of an entry, or
+        ``None`` if it doesn't identify a translation field of a registered
+        model which holds text (like ``export_translations``, other fields
+        can't take the text values of the file).
+        """
+        try:
+            model_full_name, field_name, pk = parse_entry_id(entry_id)
+        except ValueError:
+            return None
+        model = get_model(*model_full_name.split('.'))
+        if model is None or model not in translator._registry:
+            return None
+        trans_opts = translator._registry[model]
+        if (field_name not in trans_opts.fields or
+                language not in trans_opts.field_languages[field_name] or
+                not isinstance(model._meta.get_field(field_name), (CharField, TextField))):
+            return None
+        pk_field = model._meta.pk
+        while pk_field.rel:
+            # Multi-table inheritance
+            pk_field = pk_field.rel.get_related_field()
+        try:
+            pk = pk_field.to_python(pk)
+        except Exception:
+            return None
+        return model, pk, model._meta.get_field(
+            build_localized_fieldname(field_name, language))
+
+    def import_batch(self, model, batch):
+        """
+        Imports a batch of entries of ``model``, split into smaller ones if
+        the database limits the number of parameters of a statement.
+        """
+        connection = connections[self.database]
+        # Every entry takes up to 3 parameters (pk and value in the CASE
+        # expression, pk in the WHERE clause)
+        size = len(batch)
+        if connection.vendor == 'sqlite':
+            size = min(size, MAX_SQLITE_PARAMS // 3)
+        for i in range(0, len(batch), size):
+            self.import_entries(model, batch[i:i + size])
+
+    def import_entries(self, model, batch):
+        """
+        Compares entries of ``model`` with the current values and writes the
+        changed ones using a single ``UPDATE``.
+        """
+        connection = connections[self.database]
+        qn = connection.ops.quote_name
+        # Translation fields compare equal to the other translations of the
+        # same field, so they are keyed by name
+        fields = SortedDict()
+        for pk, field, value in batch:
+            fields[field.name] = field
+        # The default manager may filter out rows
+        current = dict(
+            (row[0], dict(zip(fields.keys(), row[1:])))
+            for row in QuerySet(model, using=self.database).filter(
+                pk__in=set(pk for pk, field, value in batch)).values_list(
+                'pk', *fields.keys()))
+
+        # field name -> {pk: value}
+        updates = SortedDict()
+        for pk, field, value in batch:
+            if pk not in current:
+                self.skipped += 1
+                continue
+            old_value = current[pk][field.name]
+            if getattr(field, 'compressed', False):
+                old_value = decompress(old_value)
+            counts = self.stats.setdefault(
+                ('%s.%s' % (model._meta.app_label, model._meta.module_name),
+                 field.translated_field.name, field.language), [0, 0, 0])
+            if old_value == value:
+                counts[2] += 1
+                continue
+            if old_value in (None, ''):
+                counts[0] += 1
+            else:
+                counts[1] += 1
+            updates.setdefault(field.name, {})[pk] = value
+        if not updates or self.dry_run:
+            return
+
+        pk_column = qn(model._meta.pk.column)
+        assignments = []
+        params = []
+        pks = set()
+        for field_name, values in updates.items():
+            field = fields[field_name]
+            column = qn(field.column)
+            assignments.append('%s = CASE %s %s ELSE %s END' % (
+                column, pk_column, ' '.join(['WHEN %s THEN %s'] * len(values)),
+                column))
+            for pk, value in values.items():
+                params.extend([pk, field.get_db_prep_save(value, connection=connection)])
+                pks.add(pk)
+        where = '%s IN (%s)' % (pk_column, ', '.join(['%s'] * len(pks)))
+        with transaction.commit_on_success(using=self.database):
+            cursor = connection.cursor()
+            cursor.execute('UPDATE %s SET %s WHERE %s' % (
+                qn(model._meta.db_table), ', '.join(assignments), where),
+                params + list(pks))
+            # The update bypasses save(), so recompute the completeness
+            # bitmaps and effective fields
+            update_sql = get_derived_update_sql(model, qn, where)
+            if update_sql is not None:
+                cursor.execute(update_sql, list(pks))
+            transaction.set_dirty(using=self.database)
+
+    def print_summary(self):
+        for (model_full_name, field_name, language), counts in sorted(self.stats.items()):
+            print '%s.%s [%s]: %d new, %d changed, %d unchanged' % (
+                (model_full_name, field_name, language) + tuple(counts))
+        if self.skipped:
+            print 'Skipped %d entries of unknown objects or non-text fields' % self.skipped
+        if self.dry_run:
+            print 'Dry run, nothing was written'
+        else:
+            print 'Imported %d translations' % sum(
+                counts[0] + counts[1] for counts in self.stats.values())
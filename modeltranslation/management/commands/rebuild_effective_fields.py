@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+Recompute the materialized effective values and completeness bitmaps of all
+translated models.
+
+You will need to execute this command when the fallback languages change,
+as the effective values are only computed when an object is saved.
+"""
+from optparse import make_option
+
+from django.core.management.base import NoArgsCommand
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+
+from modeltranslation.manager import get_derived_update_sql
+from modeltranslation.translator import translator
+
+
+class Command(NoArgsCommand):
+    help = ('Recomputes the effective fields and completeness bitmaps of '
+            'all translated models using a single UPDATE per model.')
+    option_list = NoArgsCommand.option_list + (
+        make_option('--database', action='store', dest='database',
+                    default=DEFAULT_DB_ALIAS,
+                    help='Nominates a database to rebuild. Defaults to the '
+                         '"default" database.'),
+    )
+
+    def handle_noargs(self, **options):
+        database = options.get('database', DEFAULT_DB_ALIAS)
+        connection = connections[database]
+        cursor = connection.cursor()
+        for model in translator._registry:
+            if (model._meta.abstract or
+                    not router.allow_syncdb(database, model)):
+                continue
+            update_sql = get_derived_update_sql(model, connection.ops.quote_name)
+            if update_sql is None:
+                continue
+            print "Rebuilding derived fields of model '%s'" % model
+            cursor.execute(update_sql)
+        transaction.commit_unless_managed(using=database)
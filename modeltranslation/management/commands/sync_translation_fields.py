@@ -9,20 +9,32 @@ You will need to execute this command in two cases:
 
 Credits: Heavily inspired by django-transmeta's sync_transmeta_db command.
 """
+import os
+import time
+from optparse import make_option
+
 from django.conf import settings
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.core.management.color import no_style
-from django.db import connection, transaction
-from django.db.models import get_models
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.db.backends.util import truncate_name
+from django.db.models import AutoField, IntegerField, get_model, get_models
+from django.utils import simplejson
 
+from modeltranslation.manager import (COMPLETENESS_FIELD, get_derived_update_sql,
+                                      get_search_index_name, get_search_index_sql)
 from modeltranslation.translator import translator, NotRegistered
 from modeltranslation.utils import build_localized_fieldname
 
 
-def ask_for_confirmation(sql_sentences, model_full_name):
+def print_sql(sql_sentences, model_full_name):
     print '\nSQL to synchronize "%s" schema:' % model_full_name
     for sentence in sql_sentences:
         print '   %s' % sentence
+
+
+def ask_for_confirmation(sql_sentences, model_full_name):
+    print_sql(sql_sentences, model_full_name)
     while True:
         prompt = ('\nAre you sure that you want to execute the previous SQL: '
                   '(y/n) [n]: ')
@@ -42,20 +54,109 @@ def print_missing_langs(missing_langs, field_name, model_name):
         field_name, model_name, ", ".join(missing_langs))
 
 
+def load_state(state_file, database):
+    """
+    Returns the progress recorded in ``state_file``, which must have been
+    written by a run on ``database``.
+    """
+    state_fp = open(state_file)
+    try:
+        state = simplejson.load(state_fp)
+    finally:
+        state_fp.close()
+    if state['database'] != database:
+        raise CommandError(
+            '"%s" records the progress on database "%s", not "%s".' % (
+                state_file, state['database'], database))
+    return state['progress']
+
+
+def save_state(state_file, database, progress):
+    state_fp = open(state_file, 'w')
+    try:
+        simplejson.dump({'database': database, 'progress': progress}, state_fp)
+    finally:
+        state_fp.close()
+
+
 class Command(BaseCommand):
     help = ('Detect new translatable fields or new available languages and '
             'sync database structure')
+    option_list = BaseCommand.option_list + (
+        make_option('--noinput', action='store_false', dest='interactive',
+                    default=True,
+                    help='Execute the SQL without asking for confirmation.'),
+        make_option('--dry-run', action='store_true', dest='dry_run',
+                    default=False,
+                    help='Only print the SQL, do not execute it.'),
+        make_option('--sql-output', dest='sql_output', default=None,
+                    help='Write the SQL to be executed to the given file.'),
+        make_option('--online', action='store_true', dest='online',
+                    default=False,
+                    help='Add nullable columns first, backfill them in small '
+                         'chunks and only then create indexes and '
+                         'constraints, to avoid locking tables for long.'),
+        make_option('--chunk-size', dest='chunk_size', type='int',
+                    default=1000,
+                    help='Number of rows backfilled per transaction in '
+                         'online mode. Defaults to 1000.'),
+        make_option('--sleep', dest='sleep', type='float', default=0.1,
+                    help='Seconds to pause between backfill chunks in online '
+                         'mode. Defaults to 0.1.'),
+        make_option('--state-file', dest='state_file', default=None,
+                    help='File recording the progress of online mode. An '
+                         'interrupted run is resumed from it. Defaults to '
+                         'sync_translation_fields.<database>.state.'),
+        make_option('--database', action='store', dest='database',
+                    default=DEFAULT_DB_ALIAS,
+                    help='Nominates a database to synchronize. Defaults to '
+                         'the "default" database.'),
+    )
+
+    def __init__(self):
+        super(Command, self).__init__()
+        self.connection = connections[DEFAULT_DB_ALIAS]
+        # db_table -> list of column names
+        self.table_fields = {}
+        # Names of all indexes (None if they can't be introspected)
+        self.index_names = None
 
     def handle(self, *args, **options):
         """
         Command execution.
         """
-        self.cursor = connection.cursor()
-        self.introspection = connection.introspection
+        database = options.get('database', DEFAULT_DB_ALIAS)
+        interactive = options.get('interactive', True)
+        dry_run = options.get('dry_run', False)
+        sql_output_file = options.get('sql_output')
+        online = options.get('online', False)
+        chunk_size = options.get('chunk_size', 1000)
+        sleep = options.get('sleep', 0.1)
+        self.database = database
+        self.state_file = (options.get('state_file') or
+                           'sync_translation_fields.%s.state' % database)
+        self.connection = connections[database]
+        self.cursor = self.connection.cursor()
+        self.introspection = self.connection.introspection
+        self.table_fields = self.get_all_table_fields()
+        self.index_names = self.get_all_index_names()
+
+        # Pending online schema changes, one per model.
+        jobs = []
+        if online and os.path.exists(self.state_file):
+            jobs = load_state(self.state_file, database)
+            print 'Resuming online schema change from "%s"' % self.state_file
+        resumed_models = set(job['model'] for job in jobs)
 
+        # The SQL of all models is collected (and confirmed) first and then
+        # executed in a single transaction, which makes the whole schema
+        # change atomic on databases supporting transactional DDL.
+        sql_to_execute = []
         all_models = get_models()
         found_missing_fields = False
         for model in all_models:
+            if not router.allow_syncdb(database, model):
+                continue
             try:
                 options = translator.get_options_for_model(model)
                 # Options returns full-wide spectrum of localized fields but
@@ -68,72 +169,515 @@ class Command(BaseCommand):
                                        if field in local_field_names]
                 model_full_name = '%s.%s' % (model._meta.app_label,
                                              model._meta.module_name)
+                if model_full_name in resumed_models:
+                    continue
                 db_table = model._meta.db_table
+                new_fields = []
                 for field_name in translatable_fields:
-                    missing_langs = list(
-                        self.get_missing_languages(field_name, db_table))
+                    missing_langs = list(self.get_missing_languages(
+                        field_name, db_table,
+                        options.field_languages[field_name]))
                     if missing_langs:
-                        found_missing_fields = True
                         print_missing_langs(
                             missing_langs, field_name, model_full_name)
-                        sql_sentences = self.get_sync_sql(
-                            field_name, missing_langs, model)
+                        new_fields.extend(
+                            build_localized_fieldname(field_name, lang)
+                            for lang in missing_langs)
+                derived_fields = []
+                search_index_fields = []
+                if model in translator._registry:
+                    derived_fields = self.get_missing_derived_fields(model)
+                    if derived_fields:
+                        print 'Missing derived fields in "%s" model: %s' % (
+                            model_full_name, ", ".join(derived_fields))
+                    search_index_fields = self.get_missing_search_index_fields(
+                        model, new_fields)
+                    if search_index_fields:
+                        print 'Missing full-text search indexes in "%s" ' \
+                            'model: %s' % (model_full_name,
+                                           ", ".join(search_index_fields))
+                sql_sentences = self.get_sync_sql(
+                    new_fields + derived_fields, model)
+                if sql_sentences:
+                    print 'Estimated table rewrites: %d (%d without ' \
+                        'grouping the columns)' % (
+                            len(sql_sentences),
+                            len(self.get_sync_sql(
+                                new_fields + derived_fields, model,
+                                grouped=False)))
+                if sql_sentences or search_index_fields:
+                    found_missing_fields = True
+                    if online:
+                        sql_sentences = self.get_online_sql(
+                            new_fields, derived_fields, model,
+                            search_index_fields)
+                    else:
+                        # Indexes are created once all columns exist
+                        sql_sentences.extend(
+                            self.get_sync_index_sql(new_fields, model))
+                        sql_sentences.extend(self.get_search_index_sql(
+                            search_index_fields, model))
+                        if new_fields or derived_fields:
+                            sql_sentences.extend(self.get_derived_sync_sql(
+                                derived_fields, model))
+                    if interactive and not dry_run:
                         execute_sql = ask_for_confirmation(
                             sql_sentences, model_full_name)
-                        if execute_sql:
-                            print 'Executing SQL...',
-                            for sentence in sql_sentences:
-                                self.cursor.execute(sentence)
-                            print 'Done'
-                        else:
-                            print 'SQL not executed'
+                    else:
+                        print_sql(sql_sentences, model_full_name)
+                        execute_sql = True
+                    if execute_sql:
+                        sql_to_execute.extend(sql_sentences)
+                        if online:
+                            job = {'model': model_full_name,
+                                   'fields': new_fields,
+                                   'derived_fields': derived_fields,
+                                   'search_index_fields': search_index_fields,
+                                   'phase': 'columns'}
+                            if not new_fields and not derived_fields:
+                                # Only indexes are missing
+                                job.update(phase='constraints', statement=0)
+                            jobs.append(job)
+                    else:
+                        print 'SQL not executed'
             except NotRegistered:
                 pass
 
-        transaction.commit_unless_managed()
-
-        if not found_missing_fields:
+        if not found_missing_fields and not jobs:
             print 'No new translatable fields detected'
 
+        if sql_to_execute and sql_output_file:
+            sql_output = open(sql_output_file, 'w')
+            try:
+                sql_output.write('\n'.join(sql_to_execute) + '\n')
+            finally:
+                sql_output.close()
+
+        if dry_run:
+            return
+        if online:
+            if jobs:
+                self.execute_online(jobs, database, chunk_size, sleep)
+        elif sql_to_execute:
+            print 'Executing SQL...',
+            self.execute_sql(sql_to_execute, database)
+            print 'Done'
+
+    def execute_sql(self, sql_sentences, database):
+        """
+        Executes the SQL in a single transaction.
+        """
+        transaction.enter_transaction_management(using=database)
+        transaction.managed(True, using=database)
+        try:
+            try:
+                for sentence in sql_sentences:
+                    self.cursor.execute(sentence)
+            except:
+                transaction.rollback(using=database)
+                raise
+            transaction.commit(using=database)
+        finally:
+            transaction.leave_transaction_management(using=database)
+
+    def execute_online(self, jobs, database, chunk_size, sleep):
+        """
+        Executes the schema changes of every job in three steps, recording
+        the progress in the state file after each of them:
+
+        1. The columns are added as nullable, which doesn't rewrite the
+           table on most databases.
+        2. The rows are backfilled in primary key ranges of ``chunk_size``
+           rows, each one committed on its own, pausing ``sleep`` seconds
+           in between to let other writers through.
+        3. The indexes and ``NOT NULL`` constraints are created.
+        """
+        for job in jobs:
+            model = get_model(*job['model'].split('.'))
+            if job['phase'] == 'columns':
+                # Some columns may exist if a previous run was interrupted
+                db_table = model._meta.db_table
+                self.table_fields.pop(db_table, None)
+                db_table_fields = self.get_table_fields(db_table)
+                missing_fields = [
+                    name for name in job['fields'] + job['derived_fields']
+                    if model._meta.get_field(name).column not in db_table_fields]
+                print 'Adding columns to "%s"...' % job['model'],
+                self.execute_sql(
+                    self.get_sync_sql(missing_fields, model, nullable=True),
+                    database)
+                print 'Done'
+                job['phase'] = 'backfill'
+                save_state(self.state_file, self.database, jobs)
+            if job['phase'] == 'backfill':
+                self.backfill(model, job, jobs, database, chunk_size, sleep)
+                job['phase'] = 'constraints'
+                job['statement'] = 0
+                save_state(self.state_file, self.database, jobs)
+            if job['phase'] == 'constraints':
+                print 'Creating indexes and constraints of "%s"...' % (
+                    job['model']),
+                sql_sentences = self.get_online_constraint_sql(
+                    job['fields'], job['derived_fields'], model,
+                    job.get('search_index_fields', []))
+                for sentence in sql_sentences[job['statement']:]:
+                    if self.concurrent_indexes():
+                        # CREATE INDEX CONCURRENTLY can't run in a transaction
+                        self.cursor.execute(sentence)
+                    else:
+                        self.execute_sql([sentence], database)
+                    job['statement'] += 1
+                    save_state(self.state_file, self.database, jobs)
+                print 'Done'
+                job['phase'] = 'done'
+                save_state(self.state_file, self.database, jobs)
+        os.remove(self.state_file)
+
+    def backfill(self, model, job, jobs, database, chunk_size, sleep):
+        """
+        Backfills the rows of ``model`` in primary key ranges, resuming after
+        the last range recorded in ``job``.
+
+        Rows written through the ORM meanwhile keep their derived fields up
+        to date on their own, so only the rows existing when the backfill
+        starts are visited.
+        """
+        qn = self.connection.ops.quote_name
+        pk = model._meta.pk
+        if not isinstance(pk, (AutoField, IntegerField)):
+            print 'Backfilling "%s" in a single transaction...' % job['model'],
+            self.execute_sql(self.get_backfill_sql(job['fields'], model),
+                             database)
+            print 'Done'
+            return
+        self.cursor.execute('SELECT MIN(%s), MAX(%s) FROM %s' % (
+            qn(pk.column), qn(pk.column), qn(model._meta.db_table)))
+        min_pk, max_pk = self.cursor.fetchone()
+        if min_pk is None:
+            return
+        start = job.get('last_pk')
+        if start is None:
+            start = min_pk - 1
+        while start < max_pk:
+            end = start + chunk_size
+            where = '%s > %d AND %s <= %d' % (
+                qn(pk.column), start, qn(pk.column), end)
+            self.execute_sql(
+                self.get_backfill_sql(job['fields'], model, where), database)
+            job['last_pk'] = end
+            save_state(self.state_file, self.database, jobs)
+            print 'Backfilled "%s" up to pk %d of %d' % (
+                job['model'], min(end, max_pk), max_pk)
+            start = end
+            if sleep and start < max_pk:
+                time.sleep(sleep)
+
     def get_table_fields(self, db_table):
         """
-        Gets table fields from schema.
+        Gets table fields from schema. Every table is only introspected once.
+        """
+        if db_table not in self.table_fields:
+            db_table_desc = self.introspection.get_table_description(
+                self.cursor, db_table)
+            self.table_fields[db_table] = [t[0] for t in db_table_desc]
+        return self.table_fields[db_table]
+
+    def get_all_table_fields(self):
+        """
+        Gets the fields of all tables from ``information_schema`` using a
+        single query, if the database provides it. Returns a dict mapping
+        table names to lists of column names (empty for other databases,
+        whose tables are introspected one by one).
+        """
+        if self.connection.vendor == 'postgresql':
+            schema = 'current_schema()'
+        elif self.connection.vendor == 'mysql':
+            schema = 'DATABASE()'
+        else:
+            return {}
+        self.cursor.execute(
+            'SELECT table_name, column_name FROM information_schema.columns '
+            'WHERE table_schema = %s' % schema)
+        table_fields = {}
+        for db_table, column in self.cursor.fetchall():
+            table_fields.setdefault(db_table, []).append(column)
+        return table_fields
+
+    def get_all_index_names(self):
+        """
+        Gets the names of all indexes using a single query, or ``None`` if
+        the database has no full-text search indexes.
         """
-        db_table_desc = self.introspection.get_table_description(
-            self.cursor, db_table)
-        return [t[0] for t in db_table_desc]
+        if self.connection.vendor == 'postgresql':
+            sql = ('SELECT indexname FROM pg_indexes '
+                   'WHERE schemaname = current_schema()')
+        elif self.connection.vendor == 'mysql':
+            sql = ('SELECT index_name FROM information_schema.statistics '
+                   'WHERE table_schema = DATABASE()')
+        else:
+            return None
+        self.cursor.execute(sql)
+        return set(row[0] for row in self.cursor.fetchall())
 
-    def get_missing_languages(self, field_name, db_table):
+    def get_missing_languages(self, field_name, db_table, languages):
         """
         Gets only missings fields.
         """
         db_table_fields = self.get_table_fields(db_table)
-        for lang_code, lang_name in settings.LANGUAGES:
+        for lang_code in languages:
             if build_localized_fieldname(
                     field_name, lang_code) not in db_table_fields:
                 yield lang_code
 
-    def get_sync_sql(self, field_name, missing_langs, model):
+    def get_sync_sql(self, new_fields, model, grouped=None, nullable=False):
         """
-        Returns SQL needed for sync schema for a new translatable field.
+        Returns SQL needed for sync schema for new translation (and derived)
+        fields.
+
+        If ``grouped`` (by default if the database supports it) all columns
+        are added using a single ``ALTER TABLE`` statement, as every statement
+        may rebuild the whole table (e.g. on MySQL).
+
+        If ``nullable`` all columns are added without ``NOT NULL``
+        constraints (see ``get_not_null_sql``).
         """
-        qn = connection.ops.quote_name
+        qn = self.connection.ops.quote_name
         style = no_style()
-        sql_output = []
+        if grouped is None:
+            grouped = self.connection.vendor in ('mysql', 'postgresql')
+        columns = []
+        constraints = []
         db_table = model._meta.db_table
-        for lang in missing_langs:
-            new_field = build_localized_fieldname(field_name, lang)
+        for new_field in new_fields:
             f = model._meta.get_field(new_field)
-            col_type = f.db_type(connection=connection)
+            col_type = f.db_type(connection=self.connection)
             field_sql = [style.SQL_FIELD(qn(f.column)),
                          style.SQL_COLTYPE(col_type)]
-            # column creation
-            sql_output.append(
-                "ALTER TABLE %s ADD COLUMN %s;" % (
-                    qn(db_table), ' '.join(field_sql)))
-            if not f.null and lang == settings.LANGUAGE_CODE:
-                sql_output.append(
+            if nullable:
+                pass
+            elif new_field == COMPLETENESS_FIELD:
+                field_sql.append(style.SQL_KEYWORD('NOT NULL DEFAULT 0'))
+            elif not f.null and f.language == settings.LANGUAGE_CODE:
+                constraints.append(
                     ("ALTER TABLE %s MODIFY COLUMN %s %s %s;" % (
                         qn(db_table), qn(f.column), col_type,
                         style.SQL_KEYWORD('NOT NULL'))))
+            columns.append(' '.join(field_sql))
+        if not columns:
+            return []
+        # column creation
+        if grouped:
+            sql_output = ["ALTER TABLE %s %s;" % (
+                qn(db_table),
+                ', '.join('ADD COLUMN %s' % c for c in columns))]
+        else:
+            sql_output = ["ALTER TABLE %s ADD COLUMN %s;" % (qn(db_table), c)
+                          for c in columns]
+        return sql_output + constraints
+
+    def get_online_sql(self, new_fields, derived_fields, model,
+                       search_index_fields=()):
+        """
+        Returns the SQL executed by the online mode, with the backfill
+        statements covering the whole table instead of a chunk of it.
+        """
+        sql_output = []
+        if new_fields or derived_fields:
+            sql_output = (
+                self.get_sync_sql(new_fields + derived_fields, model, nullable=True) +
+                self.get_backfill_sql(new_fields, model))
+        return sql_output + self.get_online_constraint_sql(
+            new_fields, derived_fields, model, search_index_fields)
+
+    def get_backfill_sql(self, new_fields, model, where=None):
+        """
+        Returns SQL filling the new columns which will become ``NOT NULL``
+        with the value of their original field and recomputing the derived
+        fields, for the rows matching ``where`` (or for all of them).
+        """
+        qn = self.connection.ops.quote_name
+        sql_output = []
+        assignments = []
+        for new_field in new_fields:
+            f = model._meta.get_field(new_field)
+            if not f.null and f.language == settings.LANGUAGE_CODE:
+                assignments.append('%s = COALESCE(%s, %s)' % (
+                    qn(f.column), qn(f.column), qn(f.translated_field.column)))
+        if assignments:
+            sql = 'UPDATE %s SET %s' % (qn(model._meta.db_table),
+                                        ', '.join(assignments))
+            if where:
+                sql += ' WHERE %s' % where
+            sql_output.append(sql + ';')
+        if model in translator._registry:
+            update_sql = get_derived_update_sql(model, qn, where)
+            if update_sql is not None:
+                sql_output.append(update_sql)
+        return sql_output
+
+    def get_online_constraint_sql(self, new_fields, derived_fields, model,
+                                  search_index_fields=()):
+        """
+        Returns SQL creating the indexes (concurrently, if possible) and the
+        ``NOT NULL`` constraints of the columns added by the online mode, and
+        the missing full-text search indexes of existing columns.
+        """
+        sql_output = []
+        for sentence in (self.get_sync_index_sql(new_fields, model) +
+                         self.get_derived_index_sql(derived_fields, model) +
+                         self.get_search_index_sql(search_index_fields, model)):
+            if self.concurrent_indexes():
+                sentence = sentence.replace(
+                    'CREATE INDEX ', 'CREATE INDEX CONCURRENTLY ', 1).replace(
+                    'CREATE UNIQUE INDEX ', 'CREATE UNIQUE INDEX CONCURRENTLY ', 1)
+            sql_output.append(sentence)
+        return sql_output + self.get_not_null_sql(
+            new_fields + derived_fields, model)
+
+    def get_not_null_sql(self, new_fields, model):
+        """
+        Returns SQL adding the ``NOT NULL`` constraints (and defaults) of
+        columns added as nullable. SQLite can't alter existing columns, so
+        they stay nullable there.
+        """
+        qn = self.connection.ops.quote_name
+        db_table = qn(model._meta.db_table)
+        sql_output = []
+        for new_field in new_fields:
+            f = model._meta.get_field(new_field)
+            if new_field == COMPLETENESS_FIELD:
+                default = '0'
+            elif not f.null and f.language == settings.LANGUAGE_CODE:
+                default = None
+            else:
+                continue
+            if self.connection.vendor == 'postgresql':
+                if default is not None:
+                    sql_output.append('ALTER TABLE %s ALTER COLUMN %s SET DEFAULT %s;' % (
+                        db_table, qn(f.column), default))
+                sql_output.append('ALTER TABLE %s ALTER COLUMN %s SET NOT NULL;' % (
+                    db_table, qn(f.column)))
+            elif self.connection.vendor == 'mysql':
+                sql = 'ALTER TABLE %s MODIFY COLUMN %s %s NOT NULL' % (
+                    db_table, qn(f.column), f.db_type(connection=self.connection))
+                if default is not None:
+                    sql += ' DEFAULT %s' % default
+                sql_output.append(sql + ';')
+        return sql_output
+
+    def concurrent_indexes(self):
+        """
+        Returns whether indexes can be created without blocking writes, which
+        needs PostgreSQL in autocommit mode.
+        """
+        return (self.connection.vendor == 'postgresql' and
+                getattr(self.connection.features, 'uses_autocommit', False))
+
+    def get_missing_derived_fields(self, model):
+        """
+        Gets the names of the completeness and effective fields of the model
+        which are missing in its table.
+        """
+        options = translator.get_options_for_model(model)
+        field_names = []
+        if getattr(options, 'completeness_bits', None):
+            field_names.append(COMPLETENESS_FIELD)
+        for effective_fieldnames in options.effective_fieldnames.values():
+            field_names.extend(sorted(effective_fieldnames.values()))
+        db_table_fields = self.get_table_fields(model._meta.db_table)
+        return [name for name in field_names
+                if model._meta.get_field(name).column not in db_table_fields]
+
+    def get_derived_sync_sql(self, derived_fields, model):
+        """
+        Returns SQL needed to create the indexes of new derived fields and to
+        recompute the completeness and effective fields of all rows (as new
+        translation fields shift the bits of the completeness bitmap and
+        change effective values).
+        """
+        sql_output = self.get_derived_index_sql(derived_fields, model)
+        if model in translator._registry:
+            update_sql = get_derived_update_sql(
+                model, self.connection.ops.quote_name)
+            if update_sql is not None:
+                sql_output.append(update_sql)
         return sql_output
+
+    def get_derived_index_sql(self, derived_fields, model):
+        """
+        Returns SQL needed to create the indexes of new derived fields.
+        """
+        style = no_style()
+        sql_output = []
+        for field_name in derived_fields:
+            sql_output.extend(self.connection.creation.sql_indexes_for_field(
+                model, model._meta.get_field(field_name), style))
+        return sql_output
+
+    def get_sync_index_sql(self, new_fields, model):
+        """
+        Returns SQL needed to create the indexes of new translation fields,
+        including the ``unique_together`` constraints containing them.
+        """
+        style = no_style()
+        sql_output = []
+        opts = model._meta
+        search_fields = getattr(
+            translator.get_options_for_model(model), 'search_fields', ())
+        for field_name in new_fields:
+            f = opts.get_field(field_name)
+            if f.unique:
+                sql_output.append(self.get_unique_index_sql(model, [f]))
+            else:
+                sql_output.extend(self.connection.creation.sql_indexes_for_field(
+                    model, f, style))
+            if f.translated_field.name in search_fields:
+                sql_output.extend(get_search_index_sql(self.connection, model, f))
+        for field_names in opts.unique_together:
+            if any(name in new_fields for name in field_names):
+                sql_output.append(self.get_unique_index_sql(
+                    model, [opts.get_field(name) for name in field_names]))
+        return sql_output
+
+    def get_unique_index_sql(self, model, fields):
+        """
+        Returns SQL creating a unique index over the given fields.
+        """
+        qn = self.connection.ops.quote_name
+        db_table = model._meta.db_table
+        columns = [f.column for f in fields]
+        index_name = truncate_name(
+            '%s_%s_uniq' % (db_table, '_'.join(columns)),
+            self.connection.ops.max_name_length())
+        return 'CREATE UNIQUE INDEX %s ON %s (%s);' % (
+            qn(index_name), qn(db_table), ', '.join(qn(c) for c in columns))
+
+    def get_search_index_sql(self, search_index_fields, model):
+        """
+        Returns SQL creating the full-text search indexes of existing
+        translation fields.
+        """
+        sql_output = []
+        for field_name in search_index_fields:
+            sql_output.extend(get_search_index_sql(
+                self.connection, model, model._meta.get_field(field_name)))
+        return sql_output
+
+    def get_missing_search_index_fields(self, model, new_fields):
+        """
+        Gets the names of the existing translation fields of the
+        ``search_fields`` of the model which lack their full-text search
+        index (e.g. as their table was created before the option was set).
+        """
+        if self.index_names is None:
+            return []
+        options = translator.get_options_for_model(model)
+        field_names = []
+        for field_name in getattr(options, 'search_fields', ()):
+            for localized_fieldname in options.localized_fieldnames[field_name]:
+                f = model._meta.get_field(localized_fieldname)
+                if (localized_fieldname not in new_fields and
+                        get_search_index_name(self.connection, model, f)
+                        not in self.index_names):
+                    field_names.append(localized_fieldname)
+        return field_names
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Report how complete the translations of the registered models are.
+
+The fill rates of a model are computed by a single aggregate query, so the
+command doesn't load any rows and is cheap even for very large tables.
+"""
+import csv
+import sys
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.utils import simplejson
+
+from modeltranslation.management.commands.update_translation_fields import (
+    get_translated_models)
+from modeltranslation.manager import get_value_sql
+from modeltranslation.utils import build_localized_fieldname
+
+FORMATS = ('table', 'json', 'csv')
+COLUMNS = ('model', 'field', 'language', 'filled', 'rows', 'rate')
+
+
+class Command(BaseCommand):
+    help = ('Reports the fill rates of the translation fields of all or the '
+            'specified translated applications or models.')
+    args = '[app_label[.ModelName] ...]'
+    option_list = BaseCommand.option_list + (
+        make_option('--format', dest='format', default='table',
+                    help='Output format: %s. Defaults to table.' % (
+                        ', '.join(FORMATS))),
+        make_option('--database', action='store', dest='database',
+                    default=DEFAULT_DB_ALIAS,
+                    help='Nominates a database to report on. Defaults to the '
+                         '"default" database.'),
+    )
+
+    def handle(self, *args, **options):
+        output_format = options.get('format', 'table')
+        if output_format not in FORMATS:
+            raise CommandError('Unknown format: %s' % output_format)
+        self.database = options.get('database', DEFAULT_DB_ALIAS)
+        coverage = []
+        for model, trans_opts in sorted(
+                get_translated_models(args),
+                key=lambda item: item[0]._meta.db_table):
+            if (model._meta.abstract or
+                    not router.allow_syncdb(self.database, model)):
+                continue
+            coverage.extend(self.get_coverage(model, trans_opts))
+        getattr(self, 'print_%s' % output_format)(coverage)
+
+    def get_coverage(self, model, trans_opts):
+        """
+        Returns a dict per translation field of ``model`` with the number of
+        filled values, the number of rows and the fill rate (``None`` for
+        empty tables), using a single query.
+
+        Fields inherited from a parent model are reported with the parent.
+        """
+        connection = connections[self.database]
+        qn = connection.ops.quote_name
+        local_fields = model._meta.local_fields
+        fields = []
+        for field_name in trans_opts.fields:
+            if model._meta.get_field(field_name) not in local_fields:
+                continue
+            for lang in trans_opts.field_languages[field_name]:
+                fields.append((field_name, lang, model._meta.get_field(
+                    build_localized_fieldname(field_name, lang))))
+        if not fields:
+            return []
+        # COUNT ignores NULL, which is what get_value_sql returns for values
+        # which aren't filled
+        cursor = connection.cursor()
+        cursor.execute('SELECT COUNT(*), %s FROM %s' % (
+            ', '.join('COUNT(%s)' % get_value_sql(f, qn) for _, _, f in fields),
+            qn(model._meta.db_table)))
+        counts = cursor.fetchone()
+        rows = counts[0]
+        model_full_name = '%s.%s' % (model._meta.app_label,
+                                     model._meta.module_name)
+        coverage = []
+        for (field_name, lang, f), filled in zip(fields, counts[1:]):
+            rate = None
+            if rows:
+                rate = round(100.0 * filled / rows, 1)
+            coverage.append({'model': model_full_name, 'field': field_name,
+                             'language': lang, 'filled': filled,
+                             'rows': rows, 'rate': rate})
+        return coverage
+
+    def print_table(self, coverage):
+        lines = [COLUMNS]
+        for item in coverage:
+            rate = item['rate']
+            if rate is None:
+                rate = '-'
+            else:
+                rate = '%.1f%%' % rate
+            lines.append((item['model'], item['field'], item['language'],
+                          str(item['filled']), str(item['rows']), rate))
+        widths = [max(len(line[i]) for line in lines)
+                  for i in range(len(COLUMNS))]
+        for line in lines:
+            # Text columns are left aligned and numbers right aligned
+            print '  '.join(
+                [value.ljust(width) for value, width in zip(line[:3], widths)] +
+                [value.rjust(width) for value, width in zip(line[3:], widths[3:])])
+
+    def print_json(self, coverage):
+        print simplejson.dumps(coverage, indent=2)
+
+    def print_csv(self, coverage):
+        writer = csv.writer(sys.stdout)
+        writer.writerow(COLUMNS)
+        for item in coverage:
+            writer.writerow([item[column] for column in COLUMNS])
@@ -1,25 +1,319 @@
 # -*- coding: utf-8 -*-
-from django.db.models import F, Q
-from django.core.management.base import NoArgsCommand
+from __future__ import with_statement  # Python 2.5 compatibility
+import os
+import sys
+import threading
+import time
+from Queue import Queue, Empty
+from optparse import make_option
 
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.db.models import (AutoField, CharField, FileField, IntegerField,
+                              Max, Min, TextField, get_app, get_model, get_models)
+from django.db.models.query import QuerySet
+
+from modeltranslation.management.commands.sync_translation_fields import (
+    load_state, save_state)
+from modeltranslation.manager import MAX_SQLITE_PARAMS, get_derived_update_sql
 from modeltranslation.settings import DEFAULT_LANGUAGE
 from modeltranslation.translator import translator
-from modeltranslation.utils import build_localized_fieldname
+from modeltranslation.utils import build_localized_fieldname, resolve_language
+
+
+def get_translated_models(args):
+    """
+    Returns the ``(model, options)`` pairs of the registered models in
+    the given applications or models (all of them if ``args`` is empty).
+    """
+    if not args:
+        return translator._registry.items()
+    translated_models = []
+    for arg in args:
+        if '.' in arg:
+            model = get_model(*arg.split('.', 1))
+            if model is None:
+                raise CommandError('Unknown model: %s' % arg)
+            if model not in translator._registry:
+                raise CommandError(
+                    'Model %s is not registered for translation' % arg)
+            models = [model]
+        else:
+            try:
+                models = get_models(get_app(arg))
+            except ImproperlyConfigured:
+                raise CommandError('Unknown application: %s' % arg)
+        for model in models:
+            if model in translator._registry:
+                translated_models.append(
+                    (model, translator._registry[model]))
+    return translated_models
+
 
+class Command(BaseCommand):
+    help = ('Updates the default translation fields of all or the specified '
+            'translated applications or models using the value of the '
+            'original field.')
+    args = '[app_label[.ModelName] ...]'
+    option_list = BaseCommand.option_list + (
+        make_option('--batch-size', dest='batch_size', type='int',
+                    default=1000,
+                    help='Number of rows updated per transaction. Defaults '
+                         'to 1000.'),
+        make_option('--sleep', dest='sleep', type='float', default=0.0,
+                    help='Seconds to pause between batches.'),
+        make_option('--checkpoint-file', dest='checkpoint_file', default=None,
+                    help='File recording the progress. An interrupted run is '
+                         'resumed from it. Defaults to '
+                         'update_translation_fields.<database>.state.'),
+        make_option('--jobs', dest='jobs', type='int', default=1,
+                    help='Number of models updated in parallel, each one '
+                         'using its own database connection. Defaults to 1.'),
+        make_option('--database', action='store', dest='database',
+                    default=DEFAULT_DB_ALIAS,
+                    help='Nominates a database to update. Defaults to the '
+                         '"default" database.'),
+    )
 
-class Command(NoArgsCommand):
-    help = ('Updates the default translation fields of all or the specified'
-            'translated application using the value of the original field.')
+    def handle(self, *args, **options):
+        batch_size = options.get('batch_size', 1000)
+        sleep = options.get('sleep', 0.0)
+        jobs = options.get('jobs', 1)
+        self.database = options.get('database', DEFAULT_DB_ALIAS)
+        self.checkpoint_file = (
+            options.get('checkpoint_file') or
+            'update_translation_fields.%s.state' % self.database)
+        # Model -> last updated primary key (or True once it is done)
+        self.checkpoint = {}
+        self.checkpoint_lock = threading.Lock()
+        if os.path.exists(self.checkpoint_file):
+            self.checkpoint = load_state(self.checkpoint_file, self.database)
+            print "Resuming from '%s'" % self.checkpoint_file
 
-    def handle(self, **options):
         print "Using default language:", DEFAULT_LANGUAGE
-        for model, trans_opts in translator._registry.items():
-            print "Updating data of model '%s'" % model
-            for fieldname in trans_opts.fields:
-                def_lang_fieldname = build_localized_fieldname(
-                    fieldname, DEFAULT_LANGUAGE)
-                # We'll only update fields which do not have an existing value
-                model.objects.filter(
-                    Q(**{def_lang_fieldname: None}) |
-                    Q(**{def_lang_fieldname: ""})).update(
-                        **{def_lang_fieldname: F(fieldname)})
+        work = []
+        model_full_names = []
+        for model, trans_opts in get_translated_models(args):
+            model_full_name = '%s.%s' % (model._meta.app_label,
+                                         model._meta.module_name)
+            model_full_names.append(model_full_name)
+            # Plain querysets, as the default manager may filter out rows
+            if (model._meta.abstract or
+                    not router.allow_syncdb(self.database, model) or
+                    self.checkpoint.get(model_full_name) is True or
+                    not QuerySet(model, using=self.database).exists()):
+                continue
+            fieldnames = list(trans_opts.fields)
+            work.append((model, model_full_name, fieldnames,
+                         self.get_pk_range(model)))
+        # Large tables first, so that they don't end up running alone
+        work.sort(key=lambda item: item[3] and item[3][1] - item[3][0] or 0,
+                  reverse=True)
+
+        if jobs > 1 and connections[self.database].vendor != 'sqlite':
+            self.run_parallel(work, jobs, batch_size, sleep)
+        else:
+            # SQLite serializes all writes anyway
+            for item in work:
+                self.update_model(*(item + (batch_size, sleep)))
+        # Keep the progress of the models of an interrupted run not updated
+        # by this one
+        for model_full_name in model_full_names:
+            self.checkpoint.pop(model_full_name, None)
+        if self.checkpoint:
+            save_state(self.checkpoint_file, self.database, self.checkpoint)
+        elif os.path.exists(self.checkpoint_file):
+            os.remove(self.checkpoint_file)
+
+    def get_pk_range(self, model):
+        """
+        Returns the lowest and highest primary key of ``model``, or ``None``
+        if its primary key isn't an integer.
+        """
+        pk = model._meta.pk
+        while pk.rel:
+            # Multi-table inheritance
+            pk = pk.rel.get_related_field()
+        if not isinstance(pk, (AutoField, IntegerField)):
+            return None
+        pk_range = QuerySet(model, using=self.database).aggregate(
+            Min('pk'), Max('pk'))
+        return pk_range['pk__min'], pk_range['pk__max']
+
+    def run_parallel(self, work, jobs, batch_size, sleep):
+        """
+        Updates the models in ``jobs`` threads, each one with its own
+        database connection.
+        """
+        queue = Queue()
+        for item in work:
+            queue.put(item + (batch_size, sleep))
+        errors = []
+
+        def worker():
+            try:
+                while not errors:
+                    try:
+                        item = queue.get_nowait()
+                    except Empty:
+                        return
+                    try:
+                        self.update_model(*item)
+                    except Exception:
+                        errors.append(sys.exc_info())
+            finally:
+                connections[self.database].close()
+
+        threads = [threading.Thread(target=worker) for i in range(jobs)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0][0], errors[0][1], errors[0][2]
+
+    def update_model(self, model, model_full_name, fieldnames, pk_range,
+                     batch_size, sleep):
+        """
+        Updates the rows of ``model`` in primary key ranges of ``batch_size``
+        rows, each one in its own transaction, resuming after the last range
+        recorded in the checkpoint.
+        """
+        print "Updating data of model '%s'" % model
+        if pk_range is None:
+            self.update_rows(model, fieldnames)
+        else:
+            min_pk, max_pk = pk_range
+            start = self.checkpoint.get(model_full_name)
+            if start is None:
+                start = min_pk - 1
+            first_pk, started = start, time.time()
+            updated = 0
+            while start < max_pk:
+                end = start + batch_size
+                updated += self.update_rows(model, fieldnames, (start, end))
+                self.save_checkpoint(model_full_name, end)
+                # The rate of the primary key range covered, as it also
+                # indicates the progress of sparse ranges or runs with few
+                # rows to update
+                print "  %s up to pk %d of %d: %d rows updated (%d pk/s)" % (
+                    model_full_name, min(end, max_pk), max_pk, updated,
+                    (min(end, max_pk) - first_pk) / max(time.time() - started, 0.001))
+                start = end
+                if sleep and start < max_pk:
+                    time.sleep(sleep)
+        self.save_checkpoint(model_full_name, True)
+
+    def save_checkpoint(self, model_full_name, value):
+        self.checkpoint_lock.acquire()
+        try:
+            self.checkpoint[model_full_name] = value
+            save_state(self.checkpoint_file, self.database, self.checkpoint)
+        finally:
+            self.checkpoint_lock.release()
+
+    def update_rows(self, model, fieldnames, pk_range=None):
+        """
+        Copies the original field values to the empty default translation
+        fields and recomputes the derived fields of the updated rows whose
+        primary key is in the half-open ``pk_range`` (or of all rows). Returns
+        the number of updated rows.
+        """
+        connection = connections[self.database]
+        qn = connection.ops.quote_name
+        pk_column = qn(model._meta.pk.column)
+        where = None
+        if pk_range is not None:
+            where = '%s > %d AND %s <= %d' % (
+                pk_column, pk_range[0], pk_column, pk_range[1])
+        update_sql = self.get_update_sql(model, fieldnames, qn, where)
+        if update_sql is None:
+            return 0
+        updated = 0
+        with transaction.commit_on_success(using=self.database):
+            cursor = connection.cursor()
+            if get_derived_update_sql(model, qn) is None:
+                cursor.execute(update_sql)
+                updated = cursor.rowcount
+            else:
+                # The update bypasses save(), so recompute the completeness
+                # bitmaps and effective fields, but only of the rows it
+                # changes (which don't match its condition afterwards)
+                condition = self.get_update_condition(model, fieldnames, qn)
+                if where:
+                    condition += ' AND %s' % where
+                cursor.execute('SELECT %s FROM %s WHERE %s' % (
+                    pk_column, qn(model._meta.db_table), condition))
+                pks = [row[0] for row in cursor.fetchall()]
+                size = len(pks) or 1
+                if connection.vendor == 'sqlite':
+                    size = min(size, MAX_SQLITE_PARAMS)
+                for i in range(0, len(pks), size):
+                    chunk = pks[i:i + size]
+                    where = '%s IN (%s)' % (pk_column, ', '.join(['%s'] * len(chunk)))
+                    cursor.execute(self.get_update_sql(model, fieldnames, qn, where), chunk)
+                    updated += cursor.rowcount
+                    cursor.execute(get_derived_update_sql(model, qn, where), chunk)
+            transaction.set_dirty(using=self.database)
+        return updated
+
+    def get_update_sql(self, model, fieldnames, qn, where=None):
+        """
+        Returns a single ``UPDATE`` copying the original field values to all
+        empty default translation fields of ``model`` (so every table is only
+        scanned once), or ``None`` if it has no such fields.
+
+        Fields inherited from a parent model are updated with the parent.
+        """
+        columns = self.get_update_columns(model, fieldnames, qn)
+        if not columns:
+            return None
+        sql = 'UPDATE %s SET %s WHERE %s' % (
+            qn(model._meta.db_table), ', '.join([
+                '%s = CASE WHEN %s THEN %s ELSE %s END' % (
+                    column, empty, orig_column, column)
+                for column, orig_column, empty in columns]),
+            self.get_update_condition(model, fieldnames, qn))
+        if where:
+            sql += ' AND %s' % where
+        return sql
+
+    def get_update_condition(self, model, fieldnames, qn):
+        """
+        Returns the SQL condition matching the rows of ``model`` with an empty
+        default translation field and a filled original field.
+        """
+        return '(%s)' % ' OR '.join([
+            empty for column, orig_column, empty in
+            self.get_update_columns(model, fieldnames, qn)])
+
+    def get_update_columns(self, model, fieldnames, qn):
+        """
+        Returns the ``(default translation column, original column,
+        condition)`` of every local field of ``model`` to update.
+        """
+        local_fields = model._meta.local_fields
+        columns = []
+        trans_opts = translator.get_options_for_model(model)
+        for fieldname in fieldnames:
+            field = model._meta.get_field(fieldname)
+            if field not in local_fields:
+                continue
+            # Reads in the default language resolve to another language if
+            # the field isn't translated into it
+            lang = resolve_language(
+                DEFAULT_LANGUAGE, trans_opts.field_languages[fieldname],
+                getattr(trans_opts, 'fallback_languages', None))
+            column = qn(model._meta.get_field(
+                build_localized_fieldname(fieldname, lang)).column)
+            # We'll only update fields which do not have an existing value,
+            # from original fields which have one
+            orig_column = qn(field.column)
+            empty = '%s IS NULL' % column
+            filled = '%s IS NOT NULL' % orig_column
+            if isinstance(field, (CharField, TextField, FileField)):
+                empty = "(%s OR %s = '')" % (empty, column)
+                filled = "%s AND %s <> ''" % (filled, orig_column)
+            columns.append((column, orig_column, '(%s AND %s)' % (empty, filled)))
+        return columns
@@ -4,37 +4,70 @@ django-linguo by Zach Mathew
 
 https://github.com/zmathew/django-linguo
 """
-from django.db import models
+import operator
+
+from django.core.exceptions import FieldError
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from django.db.backends.util import truncate_name
 from django.db.models.fields.related import RelatedField
+from django.db.models.sql.constants import QUERY_TERMS
 from django.utils.tree import Node
 
-from modeltranslation.utils import build_localized_fieldname, get_language
+from modeltranslation.utils import (build_localized_fieldname, get_language,
+                                    get_search_config, resolve_language)
 from modeltranslation import settings
 
 
-_registry = {}
+# Caches derived from the translation registry: (registry version,
+# model -> translation options, model -> fields to translatable models)
+_cache = (None, {}, {})
 
 
-def get_translatable_fields_for_model(model):
+def _get_cache():
+    """
+    Returns the caches derived from the translation registry, dropping them
+    if the registry changed since they were filled.
+    """
+    global _cache
+    from modeltranslation import translator
+    version = (translator.translator, translator.translator._version)
+    cache = _cache
+    if cache[0] != version:
+        cache = (version, {}, {})
+        _cache = cache
+    return cache
+
+
+def get_translation_options_for_model(model):
     from modeltranslation import translator
-    if model not in _registry:
+    registry = _get_cache()[1]
+    if model not in registry:
         try:
-            _registry[model] = dict(
-                translator.translator.get_options_for_model(model).localized_fieldnames)
+            registry[model] = translator.translator.get_options_for_model(model)
         except translator.NotRegistered:
-            _registry[model] = None
-    return _registry[model]
+            registry[model] = None
+    return registry[model]
+
+
+def get_translatable_fields_for_model(model):
+    opts = get_translation_options_for_model(model)
+    if opts is None:
+        return None
+    return opts.localized_fieldnames
 
 
 def rewrite_lookup_key(model, lookup_key):
-    translatable_fields = get_translatable_fields_for_model(model)
-    if translatable_fields is not None:
+    opts = get_translation_options_for_model(model)
+    if opts is not None:
         pieces = lookup_key.split('__')
         # If we are doing a lookup on a translatable field,
         # we want to rewrite it to the actual field name
         # For example, we want to rewrite "name__startswith" to "name_fr__startswith"
-        if pieces[0] in translatable_fields:
-            lookup_key = build_localized_fieldname(pieces[0], get_language())
+        if pieces[0] in opts.localized_fieldnames:
+            lang = resolve_language(
+                get_language(), opts.field_languages[pieces[0]],
+                getattr(opts, 'fallback_languages', None))
+            lookup_key = build_localized_fieldname(pieces[0], lang)
 
             remaining_lookup = '__'.join(pieces[1:])
             if remaining_lookup:
@@ -56,13 +89,275 @@ def rewrite_lookup_key(model, lookup_key):
 
 
 def get_fields_to_translatable_models(model):
-    results = []
-    for field_name in model._meta.get_all_field_names():
-        field_object, modelclass, direct, m2m = model._meta.get_field_by_name(field_name)
-        if direct and isinstance(field_object, RelatedField):
-            if get_translatable_fields_for_model(field_object.related.parent_model) is not None:
-                results.append((field_name, field_object.related.parent_model))
-    return results
+    relations = _get_cache()[2]
+    if model not in relations:
+        results = []
+        for field_name in model._meta.get_all_field_names():
+            field_object, modelclass, direct, m2m = model._meta.get_field_by_name(field_name)
+            if direct and isinstance(field_object, RelatedField):
+                if get_translatable_fields_for_model(
+                        field_object.related.parent_model) is not None:
+                    results.append((field_name, field_object.related.parent_model))
+        relations[model] = results
+    return relations[model]
+
+
+# Maximum number of parameters of a statement in SQLite before 3.32
+MAX_SQLITE_PARAMS = 999
+
+# Name of the field storing which translation fields of an object are filled,
+# added to models registered with the ``completeness`` option
+COMPLETENESS_FIELD = 'translation_completeness'
+
+
+def is_filled(value):
+    """
+    Returns whether a translation field value counts as filled. Only ``None``
+    and ``''`` are empty, e.g. ``0`` is a value (the same rule as used for
+    fallbacks).
+    """
+    return value is not None and value != ''
+
+
+def get_completeness(instance, opts):
+    """
+    Returns the completeness bitmap of ``instance``, with the bit of every
+    filled translation field set.
+    """
+    completeness = 0
+    for field_name, bit in opts.completeness_bits.iteritems():
+        # The stored values are tested, so compressed values aren't
+        # decompressed (empty values are never compressed)
+        if is_filled(instance.__dict__.get(field_name)):
+            completeness |= bit
+    return completeness
+
+
+def get_value_sql(field, qn):
+    """
+    Returns an SQL expression for the value of a translation field column,
+    which is ``NULL`` if the field isn't filled.
+    """
+    if isinstance(field, (models.CharField, models.TextField, models.FileField)):
+        return "NULLIF(%s, '')" % qn(field.column)
+    return qn(field.column)
+
+
+def get_completeness_sql(model, qn):
+    """
+    Returns an SQL expression computing the completeness bitmap of a row of
+    ``model`` from its translation field columns.
+    """
+    opts = get_translation_options_for_model(model)
+    terms = []
+    for field_name, bit in sorted(opts.completeness_bits.items(), key=lambda i: i[1]):
+        terms.append('CASE WHEN %s IS NOT NULL THEN %d ELSE 0 END' % (
+            get_value_sql(model._meta.get_field(field_name), qn), bit))
+    return ' + '.join(terms) or '0'
+
+
+def get_effective_descriptor(model, field_name):
+    """
+    Returns the descriptor of a translated field with effective fields.
+    """
+    field = model._meta.get_field(field_name)
+    return field.model.__dict__[field_name]
+
+
+def get_effective_sql(model, field_name, lang, qn):
+    """
+    Returns an SQL expression computing the effective value of a translated
+    field in language ``lang`` (``NULL`` if no translation field is filled).
+    """
+    descriptor = get_effective_descriptor(model, field_name)
+    values = [
+        get_value_sql(model._meta.get_field(build_localized_fieldname(field_name, l)), qn)
+        for l in descriptor.get_languages(lang) if l in descriptor.languages]
+    if len(values) == 1:
+        return values[0]
+    return 'COALESCE(%s)' % ', '.join(values)
+
+
+def get_derived_update_sql(model, qn, where=None):
+    """
+    Returns the SQL recomputing the completeness bitmap and the effective
+    fields of all rows of ``model`` (or of the rows matching the ``where``
+    clause), or ``None`` if it has none of them.
+    """
+    opts = get_translation_options_for_model(model)
+    assignments = []
+    if getattr(opts, 'completeness_bits', None):
+        assignments.append('%s = %s' % (
+            qn(model._meta.get_field(COMPLETENESS_FIELD).column),
+            get_completeness_sql(model, qn)))
+    for field_name, effective_fieldnames in sorted(opts.effective_fieldnames.items()):
+        for lang, effective_fieldname in sorted(effective_fieldnames.items()):
+            assignments.append('%s = %s' % (
+                qn(model._meta.get_field(effective_fieldname).column),
+                get_effective_sql(model, field_name, lang, qn)))
+    if not assignments:
+        return None
+    sql = 'UPDATE %s SET %s' % (qn(model._meta.db_table), ', '.join(assignments))
+    if where:
+        sql += ' WHERE %s' % where
+    return sql + ';'
+
+
+def update_derived_fields(sender, instance, **kwargs):
+    """
+    Updates the completeness bitmap and the effective fields of a model
+    instance before saving it (connected to the ``pre_save`` signal).
+    """
+    opts = get_translation_options_for_model(sender)
+    if opts is None:
+        return
+    if getattr(opts, 'completeness_bits', None):
+        setattr(instance, COMPLETENESS_FIELD, get_completeness(instance, opts))
+    for field_name, effective_fieldnames in opts.effective_fieldnames.iteritems():
+        descriptor = get_effective_descriptor(sender, field_name)
+        for lang, effective_fieldname in effective_fieldnames.iteritems():
+            setattr(instance, effective_fieldname,
+                    descriptor.get_value(instance, lang, default=False))
+
+
+def rewrite_order_lookup_key(model, lookup_key):
+    """
+    Rewrites an ordering lookup like ``rewrite_lookup_key``, using the
+    effective field of the current language (thus ordering by the value
+    resulting from the fallback languages) if there is one.
+    """
+    if lookup_key.startswith('-'):
+        return '-' + rewrite_order_lookup_key(model, lookup_key[1:])
+    opts = get_translation_options_for_model(model)
+    if opts is not None:
+        pieces = lookup_key.split('__')
+        effective_fieldnames = opts.effective_fieldnames.get(pieces[0])
+        if effective_fieldnames and get_language() in effective_fieldnames:
+            return '__'.join([effective_fieldnames[get_language()]] + pieces[1:])
+    return rewrite_lookup_key(model, lookup_key)
+
+
+# Lookup modifiers matching the translation fields of any / all languages,
+# e.g. ``title__any_lang__icontains``
+ANY_LANG = 'any_lang'
+ALL_LANGS = 'all_langs'
+
+
+def expand_language_lookup(model, lookup_key, value):
+    """
+    Expands a lookup using the ``any_lang`` or ``all_langs`` modifier to a
+    ``Q`` object combining the lookup on the translation fields of every
+    language with OR or AND respectively.
+
+    The languages can be restricted by listing them after the modifier, e.g.
+    ``title__any_lang__de__en__icontains``. The last piece is always taken as
+    lookup type if it is one (e.g. ``lt`` in ``title__any_lang__lt``), use
+    ``title__any_lang__lt__exact`` to restrict the lookup to Lithuanian.
+
+    Returns ``None`` if the lookup does not use one of the modifiers.
+    """
+    pieces = lookup_key.split('__')
+    opts = get_translation_options_for_model(model)
+    if (opts is not None and len(pieces) > 1 and pieces[0] in opts.localized_fieldnames and
+            pieces[1] in (ANY_LANG, ALL_LANGS)):
+        field_languages = opts.field_languages[pieces[0]]
+        remaining = pieces[2:]
+        languages = []
+        while (remaining and
+               remaining[0].replace('_', '-') in settings.AVAILABLE_LANGUAGES and
+               (len(remaining) > 1 or remaining[0] not in QUERY_TERMS)):
+            lang = remaining.pop(0).replace('_', '-')
+            if lang not in field_languages:
+                raise FieldError("Field '%s' is not translated into '%s'." % (
+                    pieces[0], lang))
+            languages.append(lang)
+        q = models.Q(*[
+            ('__'.join([build_localized_fieldname(pieces[0], code)] + remaining), value)
+            for code in languages or field_languages])
+        if pieces[1] == ANY_LANG:
+            q.connector = models.Q.OR
+        return q
+
+    if len(pieces) > 2:
+        # Check if we are doing a lookup to a related trans model
+        for field_to_trans, transmodel in get_fields_to_translatable_models(model):
+            if pieces[0] == field_to_trans:
+                q = expand_language_lookup(transmodel, '__'.join(pieces[1:]), value)
+                if q is not None:
+                    q.children = [('%s__%s' % (pieces[0], key), val)
+                                  for key, val in q.children]
+                return q
+    return None
+
+
+def get_search_vector_sql(column, lang):
+    """
+    Returns the SQL of the PostgreSQL text search vector for ``column`` holding
+    text in language ``lang``.
+    """
+    return "to_tsvector('%s', COALESCE(%s, ''))" % (get_search_config(lang), column)
+
+
+def get_search_sql(vendor, column, lang):
+    """
+    Returns the SQL condition matching a full-text search query (given as
+    parameter) against ``column`` holding text in language ``lang``, or
+    ``None`` if there is no full-text search support for the database.
+
+    The conditions are able to use the indexes created by
+    ``get_search_index_sql``.
+    """
+    if vendor == 'postgresql':
+        return "%s @@ plainto_tsquery('%s', %%s)" % (
+            get_search_vector_sql(column, lang), get_search_config(lang))
+    if vendor == 'mysql':
+        return 'MATCH (%s) AGAINST (%%s IN BOOLEAN MODE)' % column
+    return None
+
+
+def get_search_index_name(connection, model, field):
+    return truncate_name('%s_%s_search' % (model._meta.db_table, field.column),
+                         connection.ops.max_name_length())
+
+
+def get_search_index_sql(connection, model, field):
+    """
+    Returns SQL creating the full-text search index of a translation field
+    used by ``MultilingualQuerySet.search`` (for the databases supporting it).
+    """
+    qn = connection.ops.quote_name
+    db_table = model._meta.db_table
+    index_name = qn(get_search_index_name(connection, model, field))
+    if connection.vendor == 'postgresql':
+        return ['CREATE INDEX %s ON %s USING gin (%s);' % (
+            index_name, qn(db_table),
+            get_search_vector_sql(qn(field.column), field.language))]
+    if connection.vendor == 'mysql':
+        return ['CREATE FULLTEXT INDEX %s ON %s (%s);' % (
+            index_name, qn(db_table), qn(field.column))]
+    return []
+
+
+def create_search_indexes(sender, created_models, db=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    Creates the full-text search indexes of the ``search_fields`` of the
+    models created by ``syncdb`` (connected to the ``post_syncdb`` signal).
+    """
+    connection = connections[db]
+    sql_output = []
+    for model in models.get_models(sender):
+        opts = get_translation_options_for_model(model)
+        if model not in created_models or opts is None:
+            continue
+        for field_name in getattr(opts, 'search_fields', ()):
+            for localized_fieldname in opts.localized_fieldnames[field_name]:
+                sql_output.extend(get_search_index_sql(
+                    connection, model, model._meta.get_field(localized_fieldname)))
+    if sql_output:
+        cursor = connection.cursor()
+        for sql in sql_output:
+            cursor.execute(sql)
+        transaction.commit_unless_managed(using=db)
 
 
 class MultilingualQuerySet(models.query.QuerySet):
@@ -74,13 +369,16 @@ class MultilingualQuerySet(models.query.QuerySet):
                 # it can be rewritten. Otherwise sql.compiler will grab it directly from _meta
                 ordering = []
                 for key in self.model._meta.ordering:
-                    ordering.append(rewrite_lookup_key(self.model, key))
+                    ordering.append(rewrite_order_lookup_key(self.model, key))
                 self.query.add_ordering(*ordering)
 
     # This method was not present in django-linguo
     def _rewrite_q(self, q):
         "Rewrite field names inside Q call."
         if isinstance(q, tuple) and len(q) == 2:
+            lang_q = expand_language_lookup(self.model, q[0], q[1])
+            if lang_q is not None:
+                return lang_q
             return rewrite_lookup_key(self.model, q[0]), q[1]
         if isinstance(q, Node):
             q.children = map(self._rewrite_q, q.children)
@@ -99,15 +397,19 @@ class MultilingualQuerySet(models.query.QuerySet):
     def _filter_or_exclude(self, negate, *args, **kwargs):
         args = map(self._rewrite_q, args)
         for key, val in kwargs.items():
-            new_key = rewrite_lookup_key(self.model, key)
             del kwargs[key]
+            lang_q = expand_language_lookup(self.model, key, self._rewrite_f(val))
+            if lang_q is not None:
+                args.append(lang_q)
+                continue
+            new_key = rewrite_lookup_key(self.model, key)
             kwargs[new_key] = self._rewrite_f(val)
         return super(MultilingualQuerySet, self)._filter_or_exclude(negate, *args, **kwargs)
 
     def order_by(self, *field_names):
         new_args = []
         for key in field_names:
-            new_args.append(rewrite_lookup_key(self.model, key))
+            new_args.append(rewrite_order_lookup_key(self.model, key))
         return super(MultilingualQuerySet, self).order_by(*new_args)
 
     def update(self, **kwargs):
@@ -115,9 +417,151 @@ class MultilingualQuerySet(models.query.QuerySet):
             new_key = rewrite_lookup_key(self.model, key)
             del kwargs[key]
             kwargs[new_key] = self._rewrite_f(val)
-        return super(MultilingualQuerySet, self).update(**kwargs)
+        opts = get_translation_options_for_model(self.model)
+        if opts is None or not [
+                key for key in kwargs if key in opts.localized_fieldnames_rev]:
+            return super(MultilingualQuerySet, self).update(**kwargs)
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+        if get_derived_update_sql(self.model, qn) is None:
+            return super(MultilingualQuerySet, self).update(**kwargs)
+
+        # The update bypasses save(), so recompute the completeness bitmaps and
+        # effective fields of the updated rows (which may not match the
+        # filters of the queryset anymore afterwards) in the same transaction
+        forced_managed = not transaction.is_managed(using=self.db)
+        if forced_managed:
+            transaction.enter_transaction_management(using=self.db)
+            transaction.managed(True, using=self.db)
+        try:
+            pks = list(self.values_list('pk', flat=True))
+            rows = super(MultilingualQuerySet, self).update(**kwargs)
+            cursor = connection.cursor()
+            size = len(pks) or 1
+            if connection.vendor == 'sqlite':
+                size = min(size, MAX_SQLITE_PARAMS)
+            for i in range(0, len(pks), size):
+                chunk = pks[i:i + size]
+                cursor.execute(get_derived_update_sql(
+                    self.model, qn, '%s IN (%s)' % (
+                        qn(self.model._meta.pk.column), ', '.join(['%s'] * len(chunk)))),
+                    chunk)
+            transaction.set_dirty(using=self.db)
+            if forced_managed:
+                transaction.commit(using=self.db)
+        except:
+            if forced_managed:
+                transaction.rollback(using=self.db)
+            raise
+        finally:
+            if forced_managed:
+                transaction.leave_transaction_management(using=self.db)
+        return rows
     update.alters_data = True
 
+    # This method was not present in django-linguo
+    def search(self, query, fields=None):
+        """
+        Returns objects whose translated ``fields`` match the full-text search
+        ``query`` in the current language.
+
+        Searches the ``search_fields`` of the translation options (or all
+        translated text fields which aren't compressed) by default. Uses
+        full-text search on PostgreSQL and MySQL if all fields are
+        ``search_fields`` (which have full-text indexes) and falls back to
+        ``icontains`` lookups otherwise.
+        """
+        opts = get_translation_options_for_model(self.model)
+        search_fields = ()
+        if opts is not None:
+            search_fields = getattr(opts, 'search_fields', ())
+            if fields is None:
+                fields = search_fields or [
+                    f for f in opts.fields if isinstance(
+                        self.model._meta.get_field(f), (models.CharField, models.TextField)) and
+                    f not in getattr(opts, 'compress', ())]
+        if not fields:
+            raise FieldError("No translated fields to search on model '%s'." %
+                             self.model._meta.object_name)
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+        full_text = all(f in search_fields for f in fields)
+        conditions = []
+        lookups = []
+        for field_name in fields:
+            if opts is None or field_name not in opts.localized_fieldnames:
+                raise FieldError("Cannot search non-translated field '%s'." % field_name)
+            lang = resolve_language(
+                get_language(), opts.field_languages[field_name],
+                getattr(opts, 'fallback_languages', None))
+            field = self.model._meta.get_field(
+                build_localized_fieldname(field_name, lang))
+            if getattr(field, 'compressed', False):
+                raise FieldError("Cannot search compressed field '%s'." % field_name)
+            column = '%s.%s' % (qn(field.model._meta.db_table), qn(field.column))
+            sql = None
+            if full_text:
+                sql = get_search_sql(connection.vendor, column, lang)
+            if sql is None:
+                lookups.append(models.Q(**{'%s__icontains' % field.name: query}))
+            else:
+                conditions.append(sql)
+        if conditions:
+            return self.extra(where=['(%s)' % ' OR '.join(conditions)],
+                              params=[query] * len(conditions))
+        return self.filter(reduce(operator.or_, lookups))
+
+    # This method was not present in django-linguo
+    def translated_in(self, lang, fields=None):
+        """
+        Returns objects whose translated ``fields`` (by default all fields
+        translated into ``lang``) are filled in language ``lang``.
+
+        Requires the ``completeness`` translation option.
+        """
+        masked, mask = self._get_completeness_mask(lang, fields)
+        return self.extra(where=['%s = %%s' % masked], params=[mask, mask])
+
+    # This method was not present in django-linguo
+    def missing_in(self, lang, fields=None):
+        """
+        Returns objects where any of the translated ``fields`` (by default all
+        fields translated into ``lang``) is empty in language ``lang``.
+
+        Requires the ``completeness`` translation option.
+        """
+        masked, mask = self._get_completeness_mask(lang, fields)
+        return self.extra(where=['%s <> %%s' % masked], params=[mask, mask])
+
+    def _get_completeness_mask(self, lang, fields):
+        """
+        Returns the SQL masking the completeness column with the bits of the
+        translated ``fields`` in language ``lang`` and the mask itself.
+        """
+        opts = get_translation_options_for_model(self.model)
+        if opts is None or not getattr(opts, 'completeness_bits', None):
+            raise FieldError("Model '%s' is not registered with the completeness option." %
+                             self.model._meta.object_name)
+        if fields is None:
+            fields = [f for f in opts.fields if lang in opts.field_languages[f]]
+        mask = 0
+        for field_name in fields:
+            if field_name not in opts.localized_fieldnames:
+                raise FieldError("Field '%s' is not translated." % field_name)
+            if lang not in opts.field_languages[field_name]:
+                raise FieldError("Field '%s' is not translated into '%s'." % (field_name, lang))
+            mask |= opts.completeness_bits[build_localized_fieldname(field_name, lang)]
+        if not mask:
+            raise FieldError("Model '%s' has no fields translated into '%s'." % (
+                self.model._meta.object_name, lang))
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+        field = self.model._meta.get_field(COMPLETENESS_FIELD)
+        column = '%s.%s' % (qn(field.model._meta.db_table), qn(field.column))
+        if connection.vendor == 'oracle':
+            return 'BITAND(%s, %%s)' % column, mask
+        return '(%s & %%s)' % column, mask
+
     # This method was not present in django-linguo
     def create(self, **kwargs):
         populate = kwargs.pop('_populate', settings.AUTO_POPULATE)
@@ -143,3 +587,12 @@ class MultilingualManager(models.Manager):
 
     def get_query_set(self):
         return MultilingualQuerySet(self.model)
+
+    def search(self, *args, **kwargs):
+        return self.get_query_set().search(*args, **kwargs)
+
+    def translated_in(self, *args, **kwargs):
+        return self.get_query_set().translated_in(*args, **kwargs)
+
+    def missing_in(self, *args, **kwargs):
+        return self.get_query_set().missing_in(*args, **kwargs)
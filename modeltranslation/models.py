@@ -9,7 +9,6 @@ def autodiscover():
     """
     import os
     import sys
-    import copy
     from django.conf import settings
     from django.utils.importlib import import_module
     from django.utils.module_loading import module_has_submodule
@@ -20,14 +19,17 @@ def autodiscover():
         mod = import_module(app)
         # Attempt to import the app's translation module.
         module = '%s.translation' % app
-        before_import_registry = copy.copy(translator._registry)
+        before_import_registry = translator._registry
         try:
             import_module(module)
         except:
-            # Reset the model registry to the state before the last import as
-            # this import will have to reoccur on the next request and this
-            # could raise NotRegistered and AlreadyRegistered exceptions
-            translator._registry = before_import_registry
+            # Unregister the models registered by this import to return to the
+            # state before the last import as this import will have to reoccur
+            # on the next request and this could raise NotRegistered and
+            # AlreadyRegistered exceptions
+            for model in translator._registry.keys():
+                if model not in before_import_registry:
+                    translator.unregister(model)
 
             # Decide whether to bubble up this error. If the app just
             # doesn't have an translation module, we can ignore the error
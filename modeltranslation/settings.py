@@ -57,3 +57,25 @@ for key, value in FALLBACK_LANGUAGES.iteritems():
         if lang not in AVAILABLE_LANGUAGES:
             raise ImproperlyConfigured('MODELTRANSLATION_FALLBACK_LANGUAGES: "%s" '
                                        'not in LANGUAGES setting.' % lang)
+
+# Text search configurations used for full-text search on PostgreSQL by
+# language. Languages which are not listed use the 'simple' configuration.
+SEARCH_CONFIGS = {
+    'da': 'danish',
+    'de': 'german',
+    'en': 'english',
+    'es': 'spanish',
+    'fi': 'finnish',
+    'fr': 'french',
+    'hu': 'hungarian',
+    'it': 'italian',
+    'nb': 'norwegian',
+    'nl': 'dutch',
+    'no': 'norwegian',
+    'pt': 'portuguese',
+    'ro': 'romanian',
+    'ru': 'russian',
+    'sv': 'swedish',
+    'tr': 'turkish',
+}
+SEARCH_CONFIGS.update(getattr(settings, 'MODELTRANSLATION_SEARCH_CONFIGS', {}))
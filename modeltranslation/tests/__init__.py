@@ -14,7 +14,7 @@ from django import forms
 from django.conf import settings as django_settings
 from django.contrib.admin.sites import AdminSite
 from django.contrib.auth.models import User
-from django.core.exceptions import ValidationError, ImproperlyConfigured
+from django.core.exceptions import FieldError, ValidationError, ImproperlyConfigured
 from django.core.files.base import ContentFile
 from django.db.models import Q, F
 from django.db.models.loading import AppCache
@@ -29,7 +29,8 @@ from modeltranslation.admin import (TranslationAdmin,
 from modeltranslation.tests.models import (
     AbstractModelB, MultitableModelA, DataModel, FallbackModel, FallbackModel2,
     FileFieldsModel, OtherFieldsModel, TestModel, MultitableBModelA, MultitableModelC,
-    MultitableDTestModel, ManagerTestModel, CustomManagerTestModel)
+    MultitableDTestModel, ManagerTestModel, CustomManagerTestModel, LanguagesModel,
+    LanguagesModel2, UniqueModel, CompletenessModel, EffectiveModel, CompressedModel)
 from modeltranslation.tests.translation import FallbackModel2TranslationOptions
 from modeltranslation.tests.test_settings import TEST_SETTINGS
 
@@ -126,6 +127,22 @@ class ModeltranslationTestBase(TestCase):
         cls.cache.handled = {}
         cls.cache.loaded = False
 
+    def call_command(self, name, *args, **options):
+        """
+        Runs a management command and returns its output instead of printing
+        it.
+        """
+        import sys
+        from StringIO import StringIO
+        from django.core.management import call_command
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            call_command(name, *args, **options)
+            return sys.stdout.getvalue()
+        finally:
+            sys.stdout = stdout
+
     @classmethod
     def reset_cache(cls):
         """
@@ -155,7 +172,7 @@ class ModeltranslationTest(ModeltranslationTestBase):
         self.failUnless(translator.translator)
 
         # Check that all models are registered for translation
-        self.failUnlessEqual(len(translator.translator._registry), 12)
+        self.failUnlessEqual(len(translator.translator._registry), 18)
 
         # Try to unregister a model that is not registered
         self.assertRaises(translator.NotRegistered,
@@ -165,6 +182,76 @@ class ModeltranslationTest(ModeltranslationTestBase):
         self.assertRaises(translator.NotRegistered,
                           translator.translator.get_options_for_model, User)
 
+    def test_unregister(self):
+        from django.db.models import Manager
+        from django.db.models.fields.files import FileDescriptor
+        from modeltranslation.manager import MultilingualManager
+        from modeltranslation.tests import translation
+
+        trans_opts = translator.translator.get_options_for_model(TestModel)
+        translator.translator.unregister(TestModel)
+        try:
+            self.assertRaises(translator.NotRegistered,
+                              translator.translator.get_options_for_model, TestModel)
+            field_names = TestModel._meta.get_all_field_names()
+            self.assertTrue('title' in field_names)
+            self.assertFalse('title_de' in field_names)
+            self.assertFalse('title_en' in field_names)
+            self.assertFalse('title' in TestModel.__dict__)
+            self.assertFalse('__init__' in TestModel.__dict__)
+            self.assertTrue(TestModel.objects.__class__ is Manager)
+            # Lookups are not rewritten anymore
+            self.assertEqual(str(TestModel.objects.filter(title='foo').query),
+                             str(TestModel.objects.filter(title__exact='foo').query))
+            self.assertFalse('title_de' in str(TestModel.objects.filter(title='foo').query))
+            n = TestModel(title='foo')
+            self.assertEqual(n.title, 'foo')
+            self.assertFalse(hasattr(n, 'title_de'))
+        finally:
+            translator.translator.register(TestModel, trans_opts)
+        self.assertTrue(TestModel.objects.__class__ is MultilingualManager)
+        self.assertTrue('title_de' in TestModel._meta.get_all_field_names())
+        n = TestModel(title='foo')
+        self.assertEqual(n.title_de, 'foo')
+        self.assertTrue('title_de' in str(TestModel.objects.filter(title='foo').query))
+
+        # Descriptors of file fields are restored
+        translator.translator.unregister(FileFieldsModel)
+        try:
+            self.assertTrue(isinstance(FileFieldsModel.__dict__['file'], FileDescriptor))
+            self.assertFalse('file_de' in FileFieldsModel.__dict__)
+        finally:
+            translator.translator.register(
+                FileFieldsModel, translation.FileFieldsModelTranslationOptions)
+        self.assertTrue('file_de' in FileFieldsModel.__dict__)
+
+    def test_registry_version(self):
+        from modeltranslation.manager import get_translation_options_for_model
+        trans = translator.translator
+        version = trans._version
+        registry = trans._registry
+        inherited_opts = trans.get_options_for_model(MultitableDTestModel)
+        self.assertTrue(trans.get_options_for_model(MultitableDTestModel) is inherited_opts)
+        self.assertTrue(get_translation_options_for_model(MultitableDTestModel)
+                        is inherited_opts)
+
+        trans_opts = trans.get_options_for_model(TestModel)
+        trans.unregister(TestModel)
+        try:
+            self.assertEqual(trans._version, version + 1)
+            # Registry is replaced, not modified
+            self.assertTrue(TestModel in registry)
+            self.assertFalse(TestModel in trans._registry)
+            self.assertTrue(get_translation_options_for_model(TestModel) is None)
+        finally:
+            trans.register(TestModel, trans_opts)
+        self.assertEqual(trans._version, version + 2)
+        self.assertTrue(get_translation_options_for_model(TestModel) is trans_opts)
+        # Derived caches are rebuilt after a change
+        self.assertFalse(trans.get_options_for_model(MultitableDTestModel) is inherited_opts)
+        self.assertEqual(trans.get_options_for_model(MultitableDTestModel).fields,
+                         inherited_opts.fields)
+
     def test_translated_models(self):
         # First create an instance of the test model to play with
         inst = TestModel.objects.create(title="Testtitle", text="Testtext")
@@ -190,6 +277,26 @@ class ModeltranslationTest(ModeltranslationTestBase):
             inst._meta.get_field('title_de').verbose_name), u'title [de]')
         inst.delete()
 
+    def test_field_class(self):
+        from modeltranslation.fields import field_factory
+        from django.db.models import CharField
+        self.assertTrue(field_factory(CharField) is field_factory(CharField))
+        self.assertEqual(field_factory(CharField).__name__, 'TranslationCharField')
+        title_de = TestModel._meta.get_field('title_de')
+        title_en = TestModel._meta.get_field('title_en')
+        self.assertTrue(title_de.__class__ is title_en.__class__)
+        self.assertTrue(isinstance(title_de, CharField))
+
+    def test_field_shared_attributes(self):
+        title = TestModel._meta.get_field('title')
+        title_de = TestModel._meta.get_field('title_de')
+        self.assertFalse('validators' in title_de.__dict__)
+        self.assertTrue(title_de.validators is title.validators)
+        self.assertTrue(title_de.error_messages is title.error_messages)
+        self.assertEqual(title_de.max_length, title.max_length)
+        self.assertEqual(title_de.creation_counter, title.creation_counter)
+        self.assertRaises(AttributeError, getattr, title_de, 'foo')
+
     def test_set_translation(self):
         self.failUnlessEqual(get_language(), 'de')
         # First create an instance of the test model to play with
@@ -380,6 +487,1008 @@ class FallbackTests(ModeltranslationTestBase):
             self.assertEqual(n.title, '')  # if all fallbacks fail, return field.get_default()
 
 
+class LanguagesTest(ModeltranslationTestBase):
+    def test_field_languages(self):
+        class Opts(translator.TranslationOptions):
+            fields = ('title', 'text',)
+        self.assertEqual(translator.get_field_languages(TestModel, Opts),
+                         {'title': ('de', 'en'), 'text': ('de', 'en')})
+        # Order of settings.LANGUAGES is preserved
+        Opts.languages = ('en', 'de')
+        self.assertEqual(translator.get_field_languages(TestModel, Opts),
+                         {'title': ('de', 'en'), 'text': ('de', 'en')})
+        Opts.languages = ['en']
+        self.assertEqual(translator.get_field_languages(TestModel, Opts),
+                         {'title': ('en',), 'text': ('en',)})
+        Opts.languages = {'text': ('en',)}
+        self.assertEqual(translator.get_field_languages(TestModel, Opts),
+                         {'title': ('de', 'en'), 'text': ('en',)})
+        # Improper languages raise an error
+        Opts.languages = ('de', 'fr')
+        self.assertRaises(ImproperlyConfigured,
+                          translator.get_field_languages, TestModel, Opts)
+        Opts.languages = {'title': ()}
+        self.assertRaises(ImproperlyConfigured,
+                          translator.get_field_languages, TestModel, Opts)
+
+    def test_translated_models(self):
+        field_names = LanguagesModel._meta.get_all_field_names()
+        self.assertTrue('title_de' in field_names)
+        self.assertFalse('title_en' in field_names)
+        self.assertTrue('text_de' in field_names)
+        self.assertTrue('text_en' in field_names)
+        opts = translator.translator.get_options_for_model(LanguagesModel)
+        self.assertEqual(opts.localized_fieldnames['title'], ['title_de'])
+        self.assertEqual(opts.localized_fieldnames['text'], ['text_de', 'text_en'])
+
+    def test_set_translation(self):
+        n = LanguagesModel(title='title de', text='text de')
+        self.assertEqual(n.title_de, 'title de')
+        trans_real.activate('en')
+        # There is no english title, so the german one is used instead
+        self.assertEqual(n.title, 'title de')
+        self.assertEqual(n.text, None)
+        # Setting it would overwrite the german title
+        self.assertRaises(ValueError, setattr, n, 'title', 'new title')
+        n.title = 'title de'
+        n.text = 'text en'
+        self.assertEqual(n.title_de, 'title de')
+        self.assertEqual(n.text_en, 'text en')
+        self.assertFalse(hasattr(n, 'title_en'))
+        n.save()
+
+        self.assertEqual(LanguagesModel.objects.filter(title='title de').count(), 1)
+        self.assertEqual(LanguagesModel.objects.get(pk=n.pk).title, 'title de')
+        self.assertEqual(LanguagesModel.objects.filter(text='text en').count(), 1)
+        n = LanguagesModel.objects.create(title='created')
+        self.assertEqual(n.title_de, 'created')
+
+    def test_admin(self):
+        ma = TranslationAdmin(LanguagesModel, AdminSite())
+        self.assertEqual(ma.get_form(request).base_fields.keys(),
+                         ['title_de', 'text_de', 'text_en'])
+
+    def test_without_default_language(self):
+        # The field isn't translated into the default language, so the
+        # english one holds its value
+        ma = TranslationAdmin(LanguagesModel2, AdminSite())
+        field = ma.get_form(request).base_fields['title_en']
+        self.assertTrue(field.required)
+        self.assertTrue('mt-default' in field.widget.attrs['class'])
+
+        from django.db import connection
+        qn = connection.ops.quote_name
+        n = LanguagesModel2.objects.create(title_en='')
+        connection.cursor().execute("UPDATE %s SET %s = 'title'" % (
+            qn(LanguagesModel2._meta.db_table), qn('title')))
+        self.call_command('update_translation_fields', 'tests.LanguagesModel2')
+        n = LanguagesModel2.objects.get(pk=n.pk)
+        self.assertEqual(n.title_en, 'title')
+        self.assertEqual(n.title, 'title')
+
+
+class UniqueTest(ModeltranslationTestBase):
+    def test_fields(self):
+        opts = UniqueModel._meta
+        self.assertTrue(opts.get_field('title_de').unique)
+        self.assertTrue(opts.get_field('slug_de').db_index)
+        self.assertEqual(list(opts.unique_together), [
+            ('slug', 'site'), ('slug_de', 'site')])
+
+    def test_validate_unique(self):
+        UniqueModel.objects.create(title='a', slug='foo')
+        n = UniqueModel(title='b', slug='foo')
+        self.assertRaises(ValidationError, n.validate_unique)
+        n.site = 1
+        n.validate_unique()
+        n = UniqueModel(title='a', slug='bar')
+        self.assertRaises(ValidationError, n.validate_unique)
+        # Another language is fine
+        trans_real.activate('en')
+        n = UniqueModel(title='a', slug='foo')
+        n.validate_unique()
+
+    def test_untranslated(self):
+        # The constraint isn't mirrored onto the optional languages, which
+        # are left empty by untranslated objects
+        UniqueModel.objects.create(title='a', slug='foo', slug_en='')
+        n = UniqueModel(title='b', slug='bar', slug_en='')
+        n.full_clean()
+        n.save()
+        self.assertEqual(UniqueModel.objects.filter(slug_en='').count(), 2)
+
+    def test_unregister(self):
+        trans_opts = translator.translator.get_options_for_model(UniqueModel)
+        translator.translator.unregister(UniqueModel)
+        try:
+            self.assertEqual(list(UniqueModel._meta.unique_together), [('slug', 'site')])
+        finally:
+            translator.translator.register(UniqueModel, trans_opts)
+        self.assertEqual(len(UniqueModel._meta.unique_together), 2)
+
+    def test_sync_index_sql(self):
+        from django.db import connection
+        from modeltranslation.management.commands.sync_translation_fields import Command
+        qn = connection.ops.quote_name
+        sql = Command().get_sync_index_sql(['title_en', 'slug_en'], UniqueModel)
+        self.assertEqual(len(sql), 2)
+        self.assertTrue(sql[0].startswith('CREATE UNIQUE INDEX'))
+        self.assertTrue('(%s)' % qn('title_en') in sql[0])
+        self.assertTrue(sql[1].startswith('CREATE INDEX'))
+        self.assertTrue(qn('slug_en') in sql[1])
+        sql = Command().get_sync_index_sql(['slug_de'], UniqueModel)
+        self.assertEqual(len(sql), 2)
+        self.assertTrue(sql[1].startswith('CREATE UNIQUE INDEX'))
+        self.assertTrue('(%s, %s)' % (qn('slug_de'), qn('site')) in sql[1])
+
+        # Full-text search index
+        vendor = connection.vendor
+        connection.vendor = 'postgresql'
+        try:
+            sql = Command().get_sync_index_sql(['title_en'], UniqueModel)
+        finally:
+            connection.vendor = vendor
+        self.assertEqual(len(sql), 2)
+        self.assertTrue(sql[1].startswith('CREATE INDEX'))
+        self.assertTrue(sql[1].endswith(
+            "USING gin (to_tsvector('english', COALESCE(%s, '')));" % qn('title_en')))
+
+    def test_search_indexes(self):
+        from django.db import DEFAULT_DB_ALIAS, connections
+        from modeltranslation.management.commands.sync_translation_fields import Command
+        from modeltranslation.manager import create_search_indexes
+        from modeltranslation.tests import models
+        connection = connections[DEFAULT_DB_ALIAS]
+        qn = connection.ops.quote_name
+        command = Command()
+        # Indexes of existing columns are created if missing
+        self.assertEqual(command.get_missing_search_index_fields(UniqueModel, []), [])
+        command.index_names = set(['tests_uniquemodel_title_de_search'])
+        self.assertEqual(command.get_missing_search_index_fields(UniqueModel, []),
+                         ['title_en'])
+        self.assertEqual(command.get_missing_search_index_fields(UniqueModel, ['title_en']),
+                         [])
+
+        # The indexes are created with the tables
+        executed = []
+
+        class Cursor(object):
+            def execute(self, sql):
+                executed.append(sql)
+        vendor = connection.vendor
+        connection.vendor = 'mysql'
+        connection.cursor = Cursor
+        try:
+            create_search_indexes(models, created_models=set([TestModel]))
+            self.assertEqual(executed, [])
+            create_search_indexes(models, created_models=set([TestModel, UniqueModel]))
+        finally:
+            connection.vendor = vendor
+            del connection.cursor
+        self.assertEqual(executed, [
+            'CREATE FULLTEXT INDEX %s ON %s (%s);' % (
+                qn('tests_uniquemodel_title_%s_search' % lang), qn('tests_uniquemodel'),
+                qn('title_%s' % lang)) for lang in ('de', 'en')])
+
+
+class CompletenessTest(ModeltranslationTestBase):
+    def test_bitmap(self):
+        opts = translator.translator.get_options_for_model(CompletenessModel)
+        self.assertEqual(sorted(opts.completeness_bits.values()), [1, 2, 4, 8, 16, 32])
+        # A btree index can't serve the bitwise predicates
+        self.assertFalse(CompletenessModel._meta.get_field('translation_completeness').db_index)
+        bits = opts.completeness_bits
+        n = CompletenessModel.objects.create(title_de='foo', text_en='', visits_en=0)
+        self.assertEqual(n.translation_completeness, bits['title_de'] | bits['visits_en'])
+        n.text_en = 'bar'
+        n.title_de = None
+        n.save()
+        n = CompletenessModel.objects.get(pk=n.pk)
+        self.assertEqual(n.translation_completeness, bits['text_en'] | bits['visits_en'])
+
+    def test_update(self):
+        n = CompletenessModel.objects.create(title_de='foo')
+        self.assertEqual(CompletenessModel.objects.missing_in('en').count(), 1)
+        CompletenessModel.objects.filter(pk=n.pk).update(
+            title_en='bar', text_de='baz', text_en='qux', visits_de=1, visits_en=2)
+        self.assertEqual(CompletenessModel.objects.missing_in('en').count(), 0)
+        self.assertEqual(CompletenessModel.objects.translated_in('de').count(), 1)
+
+    def test_queryset(self):
+        manager = CompletenessModel.objects
+        manager.create(title_de='a', title_en='a', text_de='a', text_en='a',
+                       visits_de=1, visits_en=1)
+        manager.create(title_de='b', title_en='b', text_en='b', visits_en=2)
+        manager.create(title_de='c', visits_de=3)
+        self.assertEqual(manager.translated_in('de').count(), 1)
+        self.assertEqual(manager.translated_in('en').count(), 2)
+        self.assertEqual(manager.missing_in('en').count(), 1)
+        self.assertEqual(manager.translated_in('de', fields=['title', 'visits']).count(), 2)
+        self.assertEqual(manager.translated_in('de', fields=['title']).count(), 3)
+        self.assertEqual(manager.missing_in('de', fields=['text']).count(), 2)
+        self.assertEqual(manager.filter(title='b').translated_in('en').count(), 1)
+        self.assertRaises(FieldError, manager.translated_in, 'de', fields=['id'])
+        self.assertRaises(FieldError, TestModel.objects.translated_in, 'de')
+
+    def test_sql(self):
+        from django.db import connection
+        from modeltranslation.manager import get_completeness_sql
+        from modeltranslation.management.commands.sync_translation_fields import Command
+        qn = connection.ops.quote_name
+        command = Command()
+        command.cursor = connection.cursor()
+        command.introspection = connection.introspection
+        # Introspection commits on SQLite, so it must precede creating objects
+        self.assertEqual(command.get_missing_derived_fields(CompletenessModel), [])
+        manager = CompletenessModel.objects
+        manager.create(title_de='a', text_en='b', visits_en=0)
+        manager.update(translation_completeness=0)
+        cursor = connection.cursor()
+        cursor.execute('UPDATE %s SET translation_completeness = %s' % (
+            qn(CompletenessModel._meta.db_table), get_completeness_sql(CompletenessModel, qn)))
+        opts = translator.translator.get_options_for_model(CompletenessModel)
+        bits = opts.completeness_bits
+        self.assertEqual(manager.get().translation_completeness,
+                         bits['title_de'] | bits['text_en'] | bits['visits_en'])
+
+        sql = command.get_derived_sync_sql([], CompletenessModel)
+        self.assertEqual(len(sql), 1)
+        self.assertTrue(sql[0].startswith('UPDATE'))
+        sql = command.get_sync_sql(['translation_completeness'], CompletenessModel)
+        self.assertTrue(sql[0].endswith('bigint NOT NULL DEFAULT 0;'))
+
+    def test_unregister(self):
+        trans_opts = translator.translator.get_options_for_model(CompletenessModel)
+        translator.translator.unregister(CompletenessModel)
+        try:
+            self.assertFalse('translation_completeness' in
+                             CompletenessModel._meta.get_all_field_names())
+        finally:
+            translator.translator.register(CompletenessModel, trans_opts)
+        self.assertTrue('translation_completeness' in
+                        CompletenessModel._meta.get_all_field_names())
+
+
+class EffectiveTest(ModeltranslationTestBase):
+    def test_update(self):
+        n = EffectiveModel.objects.create(title_de='Alt')
+        m = EffectiveModel.objects.create(title_de='Anders')
+        # The updated rows don't match the filter anymore afterwards
+        self.assertEqual(EffectiveModel.objects.filter(title='Alt').update(title='Neu'), 1)
+        self.assertEqual(EffectiveModel.objects.get(pk=n.pk).title, 'Neu')
+        with override('en'):
+            self.assertEqual(EffectiveModel.objects.get(pk=n.pk).title, 'Neu')
+            EffectiveModel.objects.update(title_en='New')
+            self.assertEqual(EffectiveModel.objects.get(pk=m.pk).title, 'New')
+        self.assertEqual(EffectiveModel.objects.get(pk=m.pk).title, 'Anders')
+
+    def test_fields(self):
+        opts = translator.translator.get_options_for_model(EffectiveModel)
+        self.assertEqual(opts.effective_fieldnames, {
+            'title': {'de': 'title_effective_de', 'en': 'title_effective_en'}})
+        field = EffectiveModel._meta.get_field('title_effective_en')
+        self.assertFalse(field.editable)
+        self.assertFalse(field.unique)
+        self.assertTrue(field.null)
+
+    def test_values(self):
+        n = EffectiveModel.objects.create(title_de='Hallo')
+        self.assertEqual(n.title_effective_de, 'Hallo')
+        self.assertEqual(n.title_effective_en, 'Hallo')
+        self.assertEqual(n.text_de, None)
+
+        n = EffectiveModel.objects.get(pk=n.pk)
+        with override('en'):
+            self.assertEqual(n.title, 'Hallo')
+            # Reads the materialized value
+            n.__dict__['title_effective_en'] = 'materialized'
+            self.assertEqual(n.title, 'materialized')
+            # Changing a translation field outdates the materialized values
+            n.title_en = 'Hello'
+            self.assertEqual(n.title, 'Hello')
+            n.save()
+            self.assertEqual(n.title_effective_en, 'Hello')
+            self.assertEqual(n.title, 'Hello')
+        self.assertEqual(n.title, 'Hallo')
+
+        # Nothing filled
+        n = EffectiveModel.objects.create(title_de='')
+        self.assertEqual(n.title_effective_en, None)
+        self.assertEqual(EffectiveModel.objects.get(pk=n.pk).title, 'fallback')
+
+    def test_ordering(self):
+        manager = EffectiveModel.objects
+        manager.create(title_de='b')
+        manager.create(title_de='c', title_en='a')
+        with override('en'):
+            self.assertEqual([n.title for n in manager.order_by('title')], ['a', 'b'])
+            self.assertEqual([n.title for n in manager.order_by('-title')], ['b', 'a'])
+            self.assertTrue('title_effective_en' in str(manager.order_by('title').query))
+        self.assertEqual([n.title for n in manager.order_by('title')], ['b', 'c'])
+
+    def test_rebuild(self):
+        from django.db import connection
+        from modeltranslation.manager import get_derived_update_sql
+        qn = connection.ops.quote_name
+        EffectiveModel.objects.create(title_de='Hallo')
+        EffectiveModel.objects.update(title_effective_en=None, title_effective_de=None)
+        # Models with a completeness bitmap only are rebuilt as well
+        CompletenessModel.objects.create(title_de='Hallo')
+        CompletenessModel.objects.update(translation_completeness=0)
+        sql = get_derived_update_sql(EffectiveModel, qn)
+        self.assertTrue("%s = COALESCE(NULLIF(%s, ''), NULLIF(%s, ''))" % (
+            qn('title_effective_en'), qn('title_en'), qn('title_de')) in sql)
+        self.call_command('rebuild_effective_fields', database='default')
+        self.assertEqual(CompletenessModel.objects.translated_in('de', fields=['title']).count(), 1)
+        n = EffectiveModel.objects.get()
+        self.assertEqual(n.title_effective_de, 'Hallo')
+        self.assertEqual(n.title_effective_en, 'Hallo')
+
+    def test_unregister(self):
+        trans_opts = translator.translator.get_options_for_model(EffectiveModel)
+        translator.translator.unregister(EffectiveModel)
+        try:
+            self.assertFalse('title_effective_de' in
+                             EffectiveModel._meta.get_all_field_names())
+            self.assertFalse('title_de' in EffectiveModel.__dict__)
+        finally:
+            translator.translator.register(EffectiveModel, trans_opts)
+        self.assertEqual(EffectiveModel.objects.create(title_de='x').title_effective_en, 'x')
+
+    def test_failed_register(self):
+        trans_opts = translator.translator.get_options_for_model(EffectiveModel)
+        translator.translator.unregister(EffectiveModel)
+        field_names = [f.name for f in EffectiveModel._meta.local_fields]
+        manager_class = EffectiveModel.objects.__class__
+        try:
+            # Errors which are only detected after some fields were added
+            for options in ({'effective_fields': ('foo',)},
+                            {'completeness': True, 'effective_fields': ('foo',)},
+                            {'fields': ('text', 'title'), 'compress': ('title',)}):
+                class Opts(translator.TranslationOptions):
+                    fields = ('title', 'text')
+                for name, value in options.items():
+                    setattr(Opts, name, value)
+                self.assertRaises(ImproperlyConfigured, translator.translator.register,
+                                  EffectiveModel, Opts)
+                self.assertEqual([f.name for f in EffectiveModel._meta.local_fields],
+                                 field_names)
+                self.assertFalse('title_de' in EffectiveModel.__dict__)
+                self.assertTrue(EffectiveModel.objects.__class__ is manager_class)
+        finally:
+            translator.translator.register(EffectiveModel, trans_opts)
+        self.assertEqual(sorted(f.name for f in EffectiveModel._meta.local_fields), sorted(
+            field_names + ['title_de', 'title_en', 'text_de', 'text_en',
+                           'title_effective_de', 'title_effective_en']))
+
+
+class CompressedTest(ModeltranslationTestBase):
+    text = u'Über den Wolken muss die Freiheit wohl grenzenlos sein. ' * 20
+
+    def test_fields(self):
+        from modeltranslation.fields import create_translation_field
+        text_de = CompressedModel._meta.get_field('text_de')
+        self.assertTrue(text_de.compressed)
+        self.assertEqual(text_de.__class__.__name__, 'CompressedTranslationTextField')
+        self.assertFalse(getattr(CompressedModel._meta.get_field('title_de'), 'compressed', False))
+        self.assertRaises(ImproperlyConfigured, create_translation_field,
+                          TestModel, 'title', 'de', compressed=True)
+
+    def test_values(self):
+        n = CompressedModel.objects.create(title='foo', text=self.text, text_en=self.text)
+        self.assertEqual(n.text, self.text)
+        raw = CompressedModel.objects.values_list('text_en', flat=True)[0]
+        self.assertTrue(raw.startswith('zlib:'))
+        self.assertTrue(len(raw) < len(self.text) / 4)
+
+        # Values are decompressed lazily (saving only reads the value of the
+        # current language for the original field, the completeness bitmap
+        # is computed from the compressed values)
+        n = CompressedModel.objects.get(pk=n.pk)
+        self.assertEqual(n.__dict__['text_en'], raw)
+        n.title = 'bar'
+        n.save()
+        self.assertEqual(n.__dict__['text_en'], raw)
+        self.assertEqual(CompressedModel.objects.missing_in('en').count(), 1)
+        self.assertEqual(CompressedModel.objects.missing_in('en', fields=['text']).count(), 0)
+        self.assertEqual(n.text_en, self.text)
+        self.assertEqual(n.__dict__['text_en'], self.text)
+        self.assertEqual(CompressedModel.objects.get(pk=n.pk).text_en, self.text)
+
+        # Empty values aren't compressed
+        n = CompressedModel.objects.create(title='empty', text='')
+        self.assertEqual(CompressedModel.objects.filter(text_de='').count(), 1)
+        self.assertEqual(CompressedModel.objects.filter(text_en=None).count(), 1)
+
+    def test_lookups(self):
+        CompressedModel.objects.create(title='foo', text=self.text)
+        self.assertEqual(CompressedModel.objects.filter(text=self.text).count(), 1)
+        self.assertEqual(CompressedModel.objects.filter(text_en=self.text).count(), 0)
+        self.assertEqual(CompressedModel.objects.filter(
+            text_de__in=[self.text, 'foo']).count(), 1)
+        self.assertEqual(CompressedModel.objects.filter(text_en__isnull=True).count(), 1)
+        # Other lookups would compare with the compressed values
+        for lookup in ('text__icontains', 'text_de__startswith', 'text__any_lang__icontains'):
+            self.assertRaises(FieldError, CompressedModel.objects.filter, **{lookup: 'Wolken'})
+        self.assertEqual(CompressedModel.objects.search('foo').count(), 1)
+        self.assertRaises(FieldError, CompressedModel.objects.search, 'foo', fields=['text'])
+
+    def test_uncompressed_values(self):
+        from django.db import connection
+        from modeltranslation.fields import decompress
+        self.assertEqual(decompress('zlib:invalid'), 'zlib:invalid')
+        n = CompressedModel.objects.create(title='foo')
+        qn = connection.ops.quote_name
+        connection.cursor().execute('UPDATE %s SET %s = %%s' % (
+            qn(CompressedModel._meta.db_table), qn('text_de')), ['plain'])
+        self.assertEqual(CompressedModel.objects.get(pk=n.pk).text, 'plain')
+
+
+class SyncTranslationFieldsTest(ModeltranslationTestBase):
+    def sync(self, *args, **options):
+        return self.call_command('sync_translation_fields', *args, **options)
+
+    def test_introspection(self):
+        from django.db import connection
+        introspection = connection.introspection
+        get_table_description = introspection.get_table_description
+        tables = []
+
+        def counting_get_table_description(cursor, table_name):
+            tables.append(table_name)
+            return get_table_description(cursor, table_name)
+        introspection.get_table_description = counting_get_table_description
+        try:
+            output = self.sync()
+        finally:
+            introspection.get_table_description = get_table_description
+        self.assertTrue('No new translatable fields detected' in output)
+        # Every table is only introspected once
+        self.assertTrue(TestModel._meta.db_table in tables)
+        self.assertEqual(len(tables), len(set(tables)))
+
+    def drop_columns(self, model, columns):
+        """
+        Rebuilds the table of ``model`` without ``columns``, as SQLite only
+        supports dropping columns since version 3.35.
+        """
+        from django.core.management.color import no_style
+        from django.db import connection
+        from django.db.models import get_models
+        qn = connection.ops.quote_name
+        db_table = model._meta.db_table
+        local_fields = model._meta.local_fields
+        kept_columns = ', '.join(qn(f.column) for f in local_fields if f.column not in columns)
+        cursor = connection.cursor()
+        cursor.execute('CREATE TABLE %s AS SELECT * FROM %s' % (
+            qn('rebuilt_' + db_table), qn(db_table)))
+        cursor.execute('DROP TABLE %s' % qn(db_table))
+        # The SQL of the model without the dropped columns
+        model._meta.local_fields = [f for f in local_fields if f.column not in columns]
+        try:
+            sql = connection.creation.sql_create_model(
+                model, no_style(), set(get_models()))[0]
+            sql.extend(connection.creation.sql_indexes_for_model(model, no_style()))
+        finally:
+            model._meta.local_fields = local_fields
+        for statement in sql:
+            cursor.execute(statement)
+        cursor.execute('INSERT INTO %s (%s) SELECT %s FROM %s' % (
+            qn(db_table), kept_columns, kept_columns, qn('rebuilt_' + db_table)))
+        cursor.execute('DROP TABLE %s' % qn('rebuilt_' + db_table))
+
+    def test_sync(self):
+        import tempfile
+        from django.db import connection
+        qn = connection.ops.quote_name
+        db_table = TestModel._meta.db_table
+        cursor = connection.cursor()
+        get_columns = lambda: [
+            d[0] for d in connection.introspection.get_table_description(cursor, db_table)]
+        self.drop_columns(TestModel, ['title_en'])
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            output = self.sync(dry_run=True, sql_output=path)
+            self.assertTrue('Missing languages in "title" field' in output)
+            self.assertFalse('Executing SQL' in output)
+            self.assertFalse('title_en' in get_columns())
+            sql_output = open(path)
+            try:
+                self.assertEqual(
+                    sql_output.read(), 'ALTER TABLE %s ADD COLUMN %s varchar(255);\n' % (
+                        qn(db_table), qn('title_en')))
+            finally:
+                sql_output.close()
+            output = self.sync(interactive=False)
+            self.assertTrue('Executing SQL... Done' in output)
+            self.assertTrue('title_en' in get_columns())
+        finally:
+            os.remove(path)
+            if 'title_en' not in get_columns():
+                cursor.execute('ALTER TABLE %s ADD COLUMN %s varchar(255)' % (
+                    qn(db_table), qn('title_en')))
+
+    def test_grouped_columns(self):
+        from django.db import connection
+        from modeltranslation.management.commands.sync_translation_fields import Command
+        qn = connection.ops.quote_name
+        fields = ['title_de', 'title_en', 'text_de']
+        vendor = connection.vendor
+        connection.vendor = 'mysql'
+        try:
+            sql = Command().get_sync_sql(fields, TestModel)
+        finally:
+            connection.vendor = vendor
+        self.assertEqual(len(sql), 1)
+        self.assertTrue(sql[0].startswith(
+            'ALTER TABLE %s ADD COLUMN %s varchar(255), ADD COLUMN' % (
+                qn('tests_testmodel'), qn('title_de'))))
+        self.assertEqual(sql[0].count('ADD COLUMN'), 3)
+        # SQLite only supports adding one column per statement
+        self.assertEqual(len(Command().get_sync_sql(fields, TestModel)), 3)
+        self.assertEqual(len(Command().get_sync_sql(fields, TestModel, grouped=False)), 3)
+
+    def test_online(self):
+        import tempfile
+        import time
+        from django.core.management.base import CommandError
+        from django.db import connection
+        from modeltranslation.management.commands import sync_translation_fields
+        qn = connection.ops.quote_name
+        db_table = EffectiveModel._meta.db_table
+        cursor = connection.cursor()
+        get_columns = lambda: [
+            d[0] for d in connection.introspection.get_table_description(cursor, db_table)]
+        columns = ['title_effective_de', 'title_effective_en']
+        for i in range(5):
+            EffectiveModel.objects.create(
+                title_de='de %d' % i, title_en=i % 2 and 'en %d' % i or '')
+        first_pk = EffectiveModel.objects.order_by('pk')[0].pk
+        self.drop_columns(EffectiveModel, columns)
+        fd, state_file = tempfile.mkstemp()
+        os.close(fd)
+        os.remove(state_file)
+
+        class Interrupted(Exception):
+            pass
+
+        class ConcurrentWriter(object):
+            """
+            Writes through the ORM between the backfill chunks, as another
+            client would, and interrupts the second pause.
+            """
+            pauses = 0
+
+            def sleep(self, seconds):
+                self.pauses += 1
+                if self.pauses == 2:
+                    raise Interrupted
+                EffectiveModel.objects.create(title_de='new %d' % self.pauses)
+                obj = EffectiveModel.objects.get(pk=first_pk)
+                obj.title_en = 'changed'
+                obj.save()
+
+        sync_translation_fields.time = ConcurrentWriter()
+        options = dict(online=True, interactive=False, chunk_size=2, sleep=1,
+                       state_file=state_file)
+        try:
+            self.assertRaises(Interrupted, self.sync, **options)
+            for column in columns:
+                self.assertTrue(column in get_columns())
+            job = sync_translation_fields.load_state(state_file, 'default')[0]
+            # The progress doesn't apply to other databases
+            self.assertRaises(CommandError, sync_translation_fields.load_state,
+                              state_file, 'other')
+            self.assertEqual(job['model'], 'tests.effectivemodel')
+            self.assertEqual(job['phase'], 'backfill')
+            self.assertEqual(job['last_pk'], first_pk + 3)
+
+            output = self.sync(**options)
+            self.assertTrue('Resuming online schema change' in output)
+            self.assertFalse(os.path.exists(state_file))
+            cursor.execute('SELECT %s FROM %s' % (
+                ', '.join(qn(c) for c in ['title_de', 'title_en'] + columns), qn(db_table)))
+            rows = cursor.fetchall()
+            self.assertEqual(len(rows), 6)
+            for title_de, title_en, effective_de, effective_en in rows:
+                self.assertEqual(effective_de, title_de or None)
+                self.assertEqual(effective_en, title_en or title_de or None)
+            self.assertEqual(
+                EffectiveModel.objects.get(pk=first_pk).title_effective_en, 'changed')
+        finally:
+            sync_translation_fields.time = time
+            if os.path.exists(state_file):
+                os.remove(state_file)
+            for column in columns:
+                if column not in get_columns():
+                    cursor.execute('ALTER TABLE %s ADD COLUMN %s varchar(255)' % (
+                        qn(db_table), qn(column)))
+            # DDL commits on SQLite, so the rows outlive the test transaction
+            cursor.execute('DELETE FROM %s' % qn(db_table))
+            connection.connection.commit()
+
+
+class UpdateTranslationFieldsTest(ModeltranslationTestBase):
+    def test_derived_fields(self):
+        from django.db import connection
+        qn = connection.ops.quote_name
+        db_table = qn(EffectiveModel._meta.db_table)
+        n = EffectiveModel.objects.create(title_de='Eins')
+        m = EffectiveModel.objects.create(title_de='Zwei')
+        cursor = connection.cursor()
+        cursor.execute("UPDATE %s SET %s = 'stale', %s = NULL" % (
+            db_table, qn('title_effective_en'), qn('text')))
+        cursor.execute("UPDATE %s SET %s = %s, %s = '' WHERE %s = %%s" % (
+            db_table, qn('title'), qn('title_de'), qn('title_de'), qn('id')), [m.pk])
+        self.call_command('update_translation_fields', 'tests.EffectiveModel')
+        # Only the derived fields of the updated rows are recomputed
+        self.assertEqual(EffectiveModel.objects.get(pk=m.pk).title_effective_en, 'Zwei')
+        self.assertEqual(EffectiveModel.objects.get(pk=n.pk).title_effective_en, 'stale')
+
+    def test_custom_manager(self):
+        from django.db import connection
+        qn = connection.ops.quote_name
+        for title in ('Haus', 'Welt'):
+            CustomManagerTestModel.objects.create(title_de=title)
+        # None of the rows passes the filter of the default manager
+        connection.cursor().execute("UPDATE %s SET %s = %s, %s = ''" % (
+            qn(CustomManagerTestModel._meta.db_table), qn('title'), qn('title_de'),
+            qn('title_de')))
+        self.assertEqual(CustomManagerTestModel.objects.count(), 0)
+        self.call_command('update_translation_fields', 'tests.CustomManagerTestModel')
+        self.assertEqual(sorted(CustomManagerTestModel._base_manager.values_list(
+            'title_de', flat=True)), ['Haus', 'Welt'])
+
+    def test_batches(self):
+        import tempfile
+        import time
+        from django.core.management.base import CommandError
+        from django.db import connection
+        from modeltranslation.management.commands import update_translation_fields
+        qn = connection.ops.quote_name
+        for i in range(5):
+            TestModel.objects.create(title_de='x')
+        first_pk = TestModel.objects.order_by('pk')[0].pk
+        connection.cursor().execute("UPDATE %s SET %s = 'title ' || %s, %s = ''" % (
+            qn(TestModel._meta.db_table), qn('title'), qn('id'), qn('title_de')))
+        fd, checkpoint_file = tempfile.mkstemp()
+        os.close(fd)
+        os.remove(checkpoint_file)
+
+        class Interrupted(Exception):
+            pass
+
+        real_time = time.time
+
+        class InterruptingTime(object):
+            pauses = 0
+            time = staticmethod(real_time)
+
+            def sleep(self, seconds):
+                self.pauses += 1
+                if self.pauses == 2:
+                    raise Interrupted
+
+        def update(*args, **options):
+            return self.call_command('update_translation_fields', *args, batch_size=2, sleep=1,
+                                     checkpoint_file=checkpoint_file, **options)
+
+        update_translation_fields.time = InterruptingTime()
+        try:
+            self.assertRaises(Interrupted, update)
+            checkpoint = update_translation_fields.load_state(checkpoint_file, 'default')
+            self.assertRaises(CommandError, update_translation_fields.load_state,
+                              checkpoint_file, 'other')
+            self.assertEqual(checkpoint['tests.testmodel'], first_pk + 3)
+            self.assertEqual(TestModel.objects.filter(title_de='').count(), 1)
+            # Updating other models keeps the progress
+            update('tests.EffectiveModel')
+            self.assertEqual(update_translation_fields.load_state(
+                checkpoint_file, 'default'), {'tests.testmodel': first_pk + 3})
+            output = update()
+            self.assertTrue('Resuming' in output)
+            self.assertTrue('rows updated' in output)
+            self.assertFalse(os.path.exists(checkpoint_file))
+        finally:
+            update_translation_fields.time = time
+            if os.path.exists(checkpoint_file):
+                os.remove(checkpoint_file)
+        for n in TestModel.objects.all():
+            self.assertEqual(n.title_de, 'title %d' % n.pk)
+
+    def test_single_update(self):
+        from django.db import connection
+        from modeltranslation.management.commands.update_translation_fields import Command
+        qn = connection.ops.quote_name
+        sql = Command().get_update_sql(
+            TestModel, ['title', 'text', 'url', 'email'], qn)
+        # All fields are copied by one statement
+        self.assertEqual(sql.count('UPDATE'), 1)
+        self.assertEqual(sql.count('CASE WHEN'), 4)
+        self.assertTrue(
+            "%s = CASE WHEN ((%s IS NULL OR %s = '') AND %s IS NOT NULL AND %s <> '') "
+            "THEN %s ELSE %s END" % (
+                qn('title_de'), qn('title_de'), qn('title_de'), qn('title'), qn('title'),
+                qn('title'), qn('title_de')) in sql)
+        self.assertEqual(Command().get_update_sql(MultitableBModelA, ['titlea'], qn), None)
+
+    def test_scope_and_jobs(self):
+        from django.core.management.base import CommandError
+        from modeltranslation.management.commands.update_translation_fields import (
+            Command, get_translated_models)
+        for i in range(3):
+            TestModel.objects.create(title_de='x')
+        for i in range(2):
+            FallbackModel.objects.create(title_de='x')
+        FallbackModel.objects.filter(pk=FallbackModel.objects.order_by('pk')[0].pk).delete()
+        ManagerTestModel.objects.create(title_de='x')
+
+        updated = []
+
+        def update_model(model, model_full_name, *args):
+            updated.append(model_full_name)
+        command = Command()
+        command.update_model = update_model
+        command.execute('tests.testmodel', 'tests.fallbackmodel', 'tests.managertestmodel',
+                        checkpoint_file='missing.state')
+        # The largest tables are updated first
+        self.assertEqual(updated, ['tests.testmodel', 'tests.fallbackmodel',
+                                   'tests.managertestmodel'])
+        del updated[:]
+        command.execute('tests', checkpoint_file='missing.state')
+        self.assertTrue(set(['tests.fallbackmodel', 'tests.managertestmodel',
+                             'tests.testmodel']) <= set(updated))
+        # Empty tables are skipped
+        self.assertFalse('tests.multitablemodelc' in updated)
+        self.assertRaises(CommandError, get_translated_models, ['tests.missingmodel'])
+        self.assertRaises(CommandError, get_translated_models, ['missing'])
+
+        # The thread pool updates every model once and re-raises errors
+        def update_model(model, model_full_name, *args):
+            if model_full_name == 'tests.fallbackmodel':
+                raise ValueError(model_full_name)
+            updated.append(model_full_name)
+        del updated[:]
+        command.database = 'default'
+        command.run_parallel([(TestModel, 'tests.testmodel', [], None),
+                              (ManagerTestModel, 'tests.managertestmodel', [], None)], 2, 1, 0)
+        self.assertEqual(sorted(updated), ['tests.managertestmodel', 'tests.testmodel'])
+        command.update_model = update_model
+        self.assertRaises(ValueError, command.run_parallel,
+                          [(FallbackModel, 'tests.fallbackmodel', [], None)], 2, 1, 0)
+
+
+class TranslationCoverageTest(ModeltranslationTestBase):
+    def coverage(self, *args, **options):
+        return self.call_command('translation_coverage', *args, **options)
+
+    def test_coverage(self):
+        from django.db import connection
+        from django.utils import simplejson
+        for i in range(4):
+            CompletenessModel.objects.create(title_de='Titel %d' % i, visits_de=i)
+        CompletenessModel.objects.create(title_de='', title_en='Title')
+        connection.use_debug_cursor = True
+        try:
+            queries = len(connection.queries)
+            coverage = simplejson.loads(self.coverage('tests.completenessmodel', format='json'))
+            # A single aggregate query per model
+            self.assertEqual(len(connection.queries) - queries, 1)
+        finally:
+            connection.use_debug_cursor = None
+        coverage = dict(((item['field'], item['language']), item) for item in coverage)
+        self.assertEqual(coverage[('title', 'de')], {
+            'model': 'tests.completenessmodel', 'field': 'title', 'language': 'de',
+            'filled': 4, 'rows': 5, 'rate': 80.0})
+        self.assertEqual(coverage[('title', 'en')]['filled'], 1)
+        # 0 is a value
+        self.assertEqual(coverage[('visits', 'de')]['filled'], 4)
+        self.assertEqual(coverage[('visits', 'en')]['rate'], 0.0)
+
+        lines = self.coverage('tests.completenessmodel', format='csv').splitlines()
+        self.assertEqual(lines[0], 'model,field,language,filled,rows,rate')
+        self.assertTrue('tests.completenessmodel,title,de,4,5,80.0' in lines)
+        table = self.coverage('tests.completenessmodel', 'tests.fallbackmodel')
+        self.assertTrue('80.0%' in table)
+        # Empty tables have no rate
+        self.assertTrue('tests.fallbackmodel' in table.splitlines()[-1])
+        self.assertTrue(table.splitlines()[-1].endswith('-'))
+
+
+class ExportTranslationsTestBase(ModeltranslationTestBase):
+    def export(self, *args, **options):
+        return self.call_command('export_translations', *args, **options).decode('utf-8')
+
+    def setUp(self):
+        super(ExportTranslationsTestBase, self).setUp()
+        self.pks = [
+            TestModel.objects.create(title_de=u'Grüße', title_en='Greetings').pk,
+            TestModel.objects.create(title_de='Zwei "Zeilen"\nhier', text_de='Text').pk,
+            TestModel.objects.create(title_de='Drei', title_en='').pk,
+            TestModel.objects.create(title_en='Four').pk,
+        ]
+
+
+class ExportTranslationsTest(ExportTranslationsTestBase):
+    def test_po(self):
+        po = self.export('tests.testmodel', target_language='en', batch_size=2)
+        self.assertTrue(po.startswith('msgid ""\nmsgstr ""\n'))
+        self.assertTrue('"Language: en\\n"' in po)
+        self.assertTrue(u'msgctxt "tests.testmodel.title.%d"\nmsgid "Grüße"\n'
+                        u'msgstr "Greetings"\n' % self.pks[0] in po)
+        self.assertTrue('msgid "Zwei \\"Zeilen\\"\\nhier"\nmsgstr ""\n' in po)
+        # Entries without a source value aren't exported
+        self.assertEqual(po.count('msgctxt'), 4)
+        po = self.export('tests.testmodel', target_language='en', missing_only=True)
+        self.assertEqual(po.count('msgctxt'), 3)
+        self.assertFalse('Greetings' in po)
+        # Translating the other way
+        po = self.export('tests.testmodel', source_language='en', target_language='de')
+        self.assertTrue('msgid "Four"\nmsgstr ""' in po)
+
+    def test_xliff_and_csv(self):
+        import csv
+        from StringIO import StringIO
+        from xml.dom import minidom
+        xliff = self.export('tests', target_language='en', format='xliff')
+        document = minidom.parseString(xliff.encode('utf-8'))
+        files = document.getElementsByTagName('file')
+        self.assertTrue('tests.testmodel' in [f.getAttribute('original') for f in files])
+        units = dict((unit.getAttribute('id'), unit)
+                     for unit in document.getElementsByTagName('trans-unit'))
+        unit = units['tests.testmodel.title.%d' % self.pks[0]]
+        self.assertEqual(unit.getElementsByTagName('source')[0].firstChild.data, u'Grüße')
+        self.assertEqual(unit.getElementsByTagName('target')[0].firstChild.data, 'Greetings')
+
+        rows = list(csv.reader(StringIO(self.export(
+            'tests.testmodel', target_language='en', format='csv', missing_only=True))))
+        self.assertEqual(rows[0], ['id', 'de', 'en'])
+        self.assertEqual(rows[1], ['tests.testmodel.title.%d' % self.pks[1],
+                                   'Zwei "Zeilen"\nhier', ''])
+        self.assertEqual(len(rows), 4)
+
+    def test_compressed(self):
+        CompressedModel.objects.create(title_de='Titel', text_de=CompressedTest.text)
+        po = self.export('tests.compressedmodel', target_language='en')
+        self.assertEqual(po.count('Freiheit'), 20)
+        self.assertFalse('zlib:' in po)
+
+    def test_custom_manager(self):
+        # Rows filtered out by the default manager are exported as well
+        CustomManagerTestModel.objects.create(title_de='Haus')
+        CustomManagerTestModel.objects.create(title_de='Welt')
+        self.assertEqual(CustomManagerTestModel.objects.count(), 1)
+        po = self.export('tests.custommanagertestmodel', target_language='en')
+        self.assertEqual(po.count('msgctxt'), 2)
+
+
+class ImportTranslationsTest(ExportTranslationsTestBase):
+    def import_file(self, content, suffix, *args, **options):
+        import tempfile
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        os.write(fd, content.encode('utf-8'))
+        os.close(fd)
+        try:
+            return self.call_command('import_translations', path, *args, **options)
+        finally:
+            os.remove(path)
+
+    def test_po(self):
+        from django.db import connection
+        po = self.export('tests.testmodel', target_language='en')
+        pk0, pk1, pk2 = self.pks[:3]
+        po = po.replace('msgstr "Greetings"', 'msgstr "Hello"')
+        po = po.replace('msgid "Drei"\nmsgstr ""', 'msgid "Drei"\nmsgstr "Three"')
+        po = po.replace('msgid "Text"\nmsgstr ""', 'msgid "Text"\nmsgstr ""\n"Multi "\n"line"')
+        po += '\nmsgctxt "tests.testmodel.title.999"\nmsgid "x"\nmsgstr "y"\n'
+
+        output = self.import_file(po, '.po', dry_run=True)
+        self.assertTrue('tests.testmodel.title [en]: 1 new, 1 changed, 0 unchanged' in output)
+        self.assertTrue('tests.testmodel.text [en]: 1 new, 0 changed, 0 unchanged' in output)
+        self.assertTrue('Skipped 1 entries' in output)
+        self.assertEqual(TestModel.objects.get(pk=pk0).title_en, 'Greetings')
+
+        connection.use_debug_cursor = True
+        try:
+            queries = len(connection.queries)
+            output = self.import_file(po, '.po', batch_size=2)
+            updates = [q['sql'] for q in connection.queries[queries:]
+                       if q['sql'].startswith('UPDATE')]
+        finally:
+            connection.use_debug_cursor = None
+        self.assertTrue('Imported 3 translations' in output)
+        # Only the affected columns of 2 entries per statement
+        self.assertEqual(len(updates), 2)
+        self.assertTrue('text_en' in updates[0] and 'title_en' in updates[0])
+        self.assertFalse('text_en' in updates[1])
+        self.assertFalse('url_en' in updates[0] + updates[1])
+        self.assertEqual(TestModel.objects.get(pk=pk0).title_en, 'Hello')
+        self.assertEqual(TestModel.objects.get(pk=pk1).text_en, 'Multi line')
+        self.assertEqual(TestModel.objects.get(pk=pk2).title_en, 'Three')
+        self.assertTrue('tests.testmodel.title [en]: 0 new, 0 changed, 2 unchanged' in
+                        self.import_file(po, '.po'))
+
+    def test_custom_manager(self):
+        CustomManagerTestModel.objects.create(title_de='Haus')
+        pk = CustomManagerTestModel.objects.create(title_de='Welt').pk
+        po = self.export('tests.custommanagertestmodel', target_language='en')
+        po = po.replace('msgid "Welt"\nmsgstr ""', 'msgid "Welt"\nmsgstr "World"')
+        output = self.import_file(po, '.po')
+        self.assertTrue('Imported 1 translations' in output)
+        self.assertFalse('Skipped' in output)
+        self.assertEqual(CustomManagerTestModel._base_manager.filter(pk=pk).values_list(
+            'title_en', flat=True)[0], 'World')
+
+    def test_xliff_and_csv(self):
+        xliff = self.export('tests.testmodel', target_language='en', format='xliff')
+        xliff = xliff.replace('<source>Drei</source>\n        <target></target>',
+                              '<source>Drei</source>\n        <target>Three &amp; more</target>')
+        self.assertTrue('1 new' in self.import_file(xliff, '.xlf'))
+        self.assertEqual(TestModel.objects.get(pk=self.pks[2]).title_en, 'Three & more')
+
+        csv = self.export('tests.testmodel', target_language='en', format='csv')
+        csv = csv.replace(',Greetings', u',Grüße')
+        self.assertTrue('1 changed' in self.import_file(csv, '.csv'))
+        self.assertEqual(TestModel.objects.get(pk=self.pks[0]).title_en, u'Grüße')
+
+    def test_languages_and_params(self):
+        from django.db import connection
+        from modeltranslation.management.commands import import_translations
+        pk0, pk1, pk2 = self.pks[:3]
+        xliff = '<xliff version="1.2" xmlns="urn:oasis:names:tc:xliff:document:1.2">'
+        for lang, values in (('de', ('Eins', 'Zwei', 'Drei')),
+                             ('en', ('Greetings', 'Two', 'Three'))):
+            xliff += ('<file original="tests.testmodel" source-language="de" '
+                      'target-language="%s"><body>' % lang)
+            for pk, value in zip((pk0, pk1, pk2), values):
+                xliff += ('<trans-unit id="tests.testmodel.title.%d"><source></source>'
+                          '<target>%s</target></trans-unit>' % (pk, value))
+            xliff += '</body></file>'
+        xliff += '</xliff>'
+
+        connection.use_debug_cursor = True
+        max_params = import_translations.MAX_SQLITE_PARAMS
+        # At most 2 entries per statement
+        import_translations.MAX_SQLITE_PARAMS = 8
+        try:
+            queries = len(connection.queries)
+            output = self.import_file(xliff, '.xlf')
+            updates = [q['sql'] for q in connection.queries[queries:]
+                       if q['sql'].startswith('UPDATE')]
+        finally:
+            import_translations.MAX_SQLITE_PARAMS = max_params
+            connection.use_debug_cursor = None
+        self.assertTrue('tests.testmodel.title [de]: 0 new, 2 changed, 1 unchanged' in output)
+        self.assertTrue('tests.testmodel.title [en]: 2 new, 0 changed, 1 unchanged' in output)
+        self.assertEqual(len(updates), 2)
+        self.assertEqual([(n.title_de, n.title_en) for n in TestModel.objects.filter(
+            pk__in=(pk0, pk1, pk2)).order_by('pk')],
+            [('Eins', 'Greetings'), ('Zwei', 'Two'), ('Drei', 'Three')])
+
+    def test_non_text_fields(self):
+        n = CompletenessModel.objects.create(title_de='Titel', visits_de=1)
+        po = ('msgctxt "tests.completenessmodel.visits.%d"\nmsgid "1"\nmsgstr "eins"\n\n'
+              'msgctxt "tests.completenessmodel.title.%d"\nmsgid "Titel"\nmsgstr "Title"\n' % (
+                  n.pk, n.pk))
+        output = self.import_file(po, '.po', target_language='en')
+        self.assertTrue('Skipped 1 entries of unknown objects or non-text fields' in output)
+        n = CompletenessModel.objects.get(pk=n.pk)
+        self.assertEqual((n.title_en, n.visits_en), ('Title', None))
+
+    def test_derived_and_compressed(self):
+        n = CompressedModel.objects.create(title_de='Titel', text_de='Text')
+        e = EffectiveModel.objects.create(title_de='Titel')
+        po = ('msgctxt "tests.compressedmodel.text.%d"\nmsgid "Text"\nmsgstr "%s"\n\n'
+              'msgctxt "tests.effectivemodel.title.%d"\nmsgid "Titel"\nmsgstr "Title"\n' % (
+                  n.pk, CompressedTest.text.strip(), e.pk))
+        self.import_file(po, '.txt', format='po', target_language='en')
+        self.assertEqual(CompressedModel.objects.get(pk=n.pk).text_en, CompressedTest.text.strip())
+        self.assertTrue(CompressedModel.objects.filter(pk=n.pk).values_list(
+            'text_en', flat=True)[0].startswith('zlib:'))
+        self.assertEqual(EffectiveModel.objects.get(pk=e.pk).title_effective_en, 'Title')
+
+
 class FileFieldsTest(ModeltranslationTestBase):
     test_media_root = os.path.join(
         os.path.dirname(os.path.realpath(__file__)), 'media')
@@ -1356,6 +2465,111 @@ class TestManager(ModeltranslationTestBase):
             self.assertEqual(n.visits_en, 11)
             self.assertEqual(n.visits_de, 22)
 
+    def test_search(self):
+        TestModel.objects.create(title_de='Hallo Welt', title_en='Hello world',
+                                 text_de='Das ist ein Test')
+        TestModel.objects.create(title_de='Guten Morgen', title_en='Good morning')
+        self.assertEqual(TestModel.objects.search('world').count(), 1)
+        self.assertEqual(TestModel.objects.search('welt').count(), 0)
+        with override('de'):
+            self.assertEqual(TestModel.objects.search('welt').count(), 1)
+            self.assertEqual(TestModel.objects.search('test').count(), 1)
+            self.assertEqual(TestModel.objects.search('world').count(), 0)
+            self.assertEqual(TestModel.objects.search('test', fields=['title']).count(), 0)
+            self.assertEqual(TestModel.objects.filter(title_en__startswith='Good').search(
+                'morgen').count(), 1)
+        self.assertRaises(FieldError, TestModel.objects.search, 'foo', fields=['id'])
+
+    def test_search_sql(self):
+        from modeltranslation.manager import get_search_sql
+        self.assertEqual(
+            get_search_sql('postgresql', 'title_de', 'de'),
+            "to_tsvector('german', COALESCE(title_de, '')) @@ plainto_tsquery('german', %s)")
+        self.assertEqual(
+            get_search_sql('postgresql', 'title_xx', 'xx'),
+            "to_tsvector('simple', COALESCE(title_xx, '')) @@ plainto_tsquery('simple', %s)")
+        self.assertEqual(get_search_sql('mysql', 'title_de', 'de'),
+                         "MATCH (title_de) AGAINST (%s IN BOOLEAN MODE)")
+        self.assertEqual(get_search_sql('sqlite', 'title_de', 'de'), None)
+
+        from django.db import connection
+        qn = connection.ops.quote_name
+        vendor = connection.vendor
+        connection.vendor = 'postgresql'
+        try:
+            sql = str(UniqueModel.objects.search('foo').query)
+            # Fields without full-text index aren't searched using full-text search
+            fallback_sql = str(TestModel.objects.search('foo', fields=['title']).query)
+        finally:
+            connection.vendor = vendor
+        self.assertTrue("to_tsvector('english', COALESCE(%s.%s, ''))" % (
+            qn('tests_uniquemodel'), qn('title_en')) in sql)
+        self.assertFalse('to_tsvector' in fallback_sql)
+        self.assertTrue('LIKE' in fallback_sql)
+
+    def test_search_fields(self):
+        class Opts(translator.TranslationOptions):
+            fields = ('title', 'text', 'visits')
+            search_fields = ('title', 'text')
+        check = translator.check_search_fields
+        check(CompletenessModel, Opts)
+        Opts.search_fields = ('title', 'foo')
+        self.assertRaises(ImproperlyConfigured, check, CompletenessModel, Opts)
+        Opts.search_fields = ('visits',)
+        self.assertRaises(ImproperlyConfigured, check, CompletenessModel, Opts)
+        Opts.search_fields = ('text',)
+        Opts.compress = ('text',)
+        self.assertRaises(ImproperlyConfigured, check, CompletenessModel, Opts)
+
+    def test_order_by(self):
+        ManagerTestModel.objects.create(title_en='a', title_de='b')
+        ManagerTestModel.objects.create(title_en='b', title_de='a')
+        titles = lambda qs: [n.title_en for n in qs]
+        self.assertEqual(titles(ManagerTestModel.objects.order_by('title')), ['a', 'b'])
+        self.assertEqual(titles(ManagerTestModel.objects.order_by('-title')), ['b', 'a'])
+        with override('de'):
+            self.assertEqual(titles(ManagerTestModel.objects.order_by('-title')), ['a', 'b'])
+
+    def test_language_lookups(self):
+        TestModel.objects.create(title_de='Hallo Welt', title_en='Hello world')
+        TestModel.objects.create(title_de='Welt', title_en='')
+        TestModel.objects.create(title_de='', title_en='')
+        manager = TestModel.objects
+        self.assertEqual(manager.filter(title__any_lang__icontains='welt').count(), 2)
+        self.assertEqual(manager.filter(title__all_langs__icontains='w').count(), 1)
+        self.assertEqual(manager.filter(title__all_langs='').count(), 1)
+        self.assertEqual(manager.exclude(title__any_lang__icontains='world').count(), 2)
+        self.assertEqual(manager.filter(Q(title__any_lang__en__icontains='welt') |
+                                        Q(title__any_lang__en__icontains='world')).count(), 1)
+        self.assertEqual(manager.filter(title__all_langs__de__startswith='Hallo').count(), 1)
+        self.assertEqual(manager.filter(title__any_lang__isnull=True).count(), 0)
+        self.assertEqual(manager.filter(title__all_langs__exact=F('title_de')).count(), 1)
+
+        q = manager.filter(title__any_lang__icontains='foo').query
+        self.assertEqual(len(q.where.children), 1)
+        self.assertEqual(q.where.children[0].connector, 'OR')
+        self.assertEqual(len(q.where.children[0].children), 2)
+
+        languages = LanguagesModel.objects
+        LanguagesModel.objects.create(title_de='Welt', text_de='foo', text_en='bar')
+        self.assertEqual(languages.filter(title__all_langs='Welt').count(), 1)
+        self.assertEqual(languages.filter(text__any_lang='bar').count(), 1)
+        self.assertRaises(FieldError, languages.filter, title__any_lang__en='Welt')
+
+    def test_language_lookups_ambiguous(self):
+        TestModel.objects.create(title_de='a', title_en='z')
+        TestModel.objects.create(title_de='z', title_en='z')
+        mt_settings.AVAILABLE_LANGUAGES.append('lt')
+        try:
+            # A lookup type which is also a language code is taken as lookup
+            # type if it comes last
+            manager = TestModel.objects
+            self.assertEqual(manager.filter(title__any_lang__lt='m').count(), 1)
+            self.assertEqual(manager.filter(title__all_langs__gt='m').count(), 1)
+            self.assertRaises(FieldError, manager.filter, title__any_lang__lt__exact='m')
+        finally:
+            mt_settings.AVAILABLE_LANGUAGES.remove('lt')
+
     def test_custom_manager(self):
         """Test if user-defined manager is still working"""
         n = CustomManagerTestModel(title='')
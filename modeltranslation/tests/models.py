@@ -25,6 +25,40 @@ class FallbackModel2(models.Model):
     email = models.EmailField(blank=True, null=True)
 
 
+class LanguagesModel(models.Model):
+    title = models.CharField(ugettext_lazy('title'), max_length=255)
+    text = models.TextField(blank=True, null=True)
+
+
+class LanguagesModel2(models.Model):
+    title = models.CharField(ugettext_lazy('title'), max_length=255)
+
+
+class UniqueModel(models.Model):
+    title = models.CharField(ugettext_lazy('title'), max_length=255, unique=True)
+    slug = models.SlugField()
+    site = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = (('slug', 'site'),)
+
+
+class CompletenessModel(models.Model):
+    title = models.CharField(ugettext_lazy('title'), max_length=255)
+    text = models.TextField(blank=True, null=True)
+    visits = models.IntegerField(null=True, blank=True)
+
+
+class EffectiveModel(models.Model):
+    title = models.CharField(ugettext_lazy('title'), max_length=255)
+    text = models.TextField(blank=True, null=True)
+
+
+class CompressedModel(models.Model):
+    title = models.CharField(ugettext_lazy('title'), max_length=255)
+    text = models.TextField(blank=True, null=True)
+
+
 class FileFieldsModel(models.Model):
     title = models.CharField(ugettext_lazy('title'), max_length=255)
     file = models.FileField(upload_to='test', null=True, blank=True)
@@ -3,8 +3,10 @@ from django.utils.translation import ugettext_lazy
 
 from modeltranslation.translator import translator, TranslationOptions
 from modeltranslation.tests.models import (
-    TestModel, FallbackModel, FallbackModel2,
-    FileFieldsModel, OtherFieldsModel, AbstractModelA, AbstractModelB,
+    TestModel, FallbackModel, FallbackModel2, LanguagesModel, LanguagesModel2,
+    UniqueModel,
+    CompletenessModel, EffectiveModel, CompressedModel, FileFieldsModel, OtherFieldsModel,
+    AbstractModelA, AbstractModelB,
     MultitableModelA, MultitableBModelA, MultitableModelC,
     ManagerTestModel, CustomManagerTestModel)
 
@@ -27,6 +29,48 @@ class FallbackModel2TranslationOptions(TranslationOptions):
 translator.register(FallbackModel2, FallbackModel2TranslationOptions)
 
 
+class LanguagesModelTranslationOptions(TranslationOptions):
+    fields = ('title', 'text',)
+    languages = {'title': ('de',)}
+translator.register(LanguagesModel, LanguagesModelTranslationOptions)
+
+
+class LanguagesModel2TranslationOptions(TranslationOptions):
+    fields = ('title',)
+    languages = ('en',)
+translator.register(LanguagesModel2, LanguagesModel2TranslationOptions)
+
+
+class UniqueModelTranslationOptions(TranslationOptions):
+    fields = ('title', 'slug',)
+    search_fields = ('title',)
+translator.register(UniqueModel, UniqueModelTranslationOptions)
+
+
+class CompletenessModelTranslationOptions(TranslationOptions):
+    fields = ('title', 'text', 'visits',)
+    languages = ('de', 'en')
+    completeness = True
+translator.register(CompletenessModel, CompletenessModelTranslationOptions)
+
+
+class EffectiveModelTranslationOptions(TranslationOptions):
+    fields = ('title', 'text',)
+    languages = ('de', 'en')
+    fallback_languages = {'default': ('de',)}
+    fallback_values = 'fallback'
+    effective_fields = ('title',)
+translator.register(EffectiveModel, EffectiveModelTranslationOptions)
+
+
+class CompressedModelTranslationOptions(TranslationOptions):
+    fields = ('title', 'text',)
+    languages = ('de', 'en')
+    compress = ('text',)
+    completeness = True
+translator.register(CompressedModel, CompressedModelTranslationOptions)
+
+
 class FileFieldsModelTranslationOptions(TranslationOptions):
     fields = ('title', 'file', 'image',)
 translator.register(FileFieldsModel, FileFieldsModelTranslationOptions)
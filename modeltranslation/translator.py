@@ -1,12 +1,26 @@
 # -*- coding: utf-8 -*-
-from django.conf import settings
-from django.db.models import Manager
-from django.db.models.base import ModelBase
+import threading
 
-from modeltranslation.fields import (TranslationFieldDescriptor,
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import (BigIntegerField, CharField, Manager, TextField,
+                              signals)
+from django.db.models.base import ModelBase
+from django.db.models.fields import NOT_PROVIDED
+from django.db.models.fields.files import FileField
+
+from modeltranslation import settings as mt_settings
+from modeltranslation.fields import (CompressedValueDescriptor,
+                                     EffectiveFieldDescriptor,
+                                     EffectiveStateDescriptor,
+                                     TranslationFieldDescriptor,
+                                     build_effective_state_key,
                                      create_translation_field)
-from modeltranslation.manager import MultilingualManager, rewrite_lookup_key
-from modeltranslation.utils import build_localized_fieldname
+from modeltranslation.manager import (COMPLETENESS_FIELD, MultilingualManager,
+                                      create_search_indexes, rewrite_lookup_key,
+                                      update_derived_fields)
+from modeltranslation.utils import (build_effective_fieldname,
+                                    build_localized_fieldname,
+                                    resolve_language)
 
 
 class AlreadyRegistered(Exception):
@@ -31,25 +45,91 @@ class TranslationOptions(object):
         self.localized_fieldnames = []
 
 
-def add_localized_fields(model):
+def get_field_languages(model, translation_opts):
+    """
+    Returns a dict mapping every field defined in the translation options of
+    the model to the tuple of languages it should be translated into.
+
+    By default a field is translated into every language of
+    ``settings.LANGUAGES``. The ``languages`` option restricts this either for
+    all fields (when given as tuple or list) or per field (when given as dict,
+    fields missing from the dict are translated into every language).
+    """
+    languages = getattr(translation_opts, 'languages', None)
+    field_languages = dict()
+    for field_name in translation_opts.fields:
+        if isinstance(languages, dict):
+            langs = languages.get(field_name, mt_settings.AVAILABLE_LANGUAGES)
+        elif languages is None:
+            langs = mt_settings.AVAILABLE_LANGUAGES
+        else:
+            langs = languages
+        if not langs:
+            raise ImproperlyConfigured(
+                'No languages given for field "%s" of model "%s".' % (
+                    field_name, model._meta.object_name))
+        for lang in langs:
+            if lang not in mt_settings.AVAILABLE_LANGUAGES:
+                raise ImproperlyConfigured(
+                    'Language "%s" of field "%s" of model "%s" is not in '
+                    'LANGUAGES setting.' % (
+                        lang, field_name, model._meta.object_name))
+        # Keep the order of settings.LANGUAGES, e.g. for the admin
+        field_languages[field_name] = tuple(
+            l for l in mt_settings.AVAILABLE_LANGUAGES if l in langs)
+    return field_languages
+
+
+def check_search_fields(model, translation_opts):
+    """
+    Checks that the fields listed in the ``search_fields`` translation option
+    can be searched (and get full-text indexes).
+    """
+    for field_name in getattr(translation_opts, 'search_fields', ()):
+        if field_name not in translation_opts.fields:
+            raise ImproperlyConfigured(
+                'Search field "%s" of model "%s" is not translated.' % (
+                    field_name, model._meta.object_name))
+        if not isinstance(model._meta.get_field(field_name),
+                          (CharField, TextField)):
+            raise ImproperlyConfigured(
+                'Search field "%s" of model "%s" is not a text field.' % (
+                    field_name, model._meta.object_name))
+        if field_name in getattr(translation_opts, 'compress', ()):
+            raise ImproperlyConfigured(
+                'Search field "%s" of model "%s" is compressed, which is not '
+                'supported.' % (field_name, model._meta.object_name))
+
+
+def add_localized_fields(model, translation_opts):
     """
     Monkey patches the original model class to provide additional fields for
-    every language. Only do that for fields which are defined in the
+    every language of a field. Only do that for fields which are defined in the
     translation options of the model.
 
+    The localized fields of the fields listed in the ``compress`` translation
+    option store their values compressed.
+
     Returns a dict mapping the original fieldname to a list containing the
     names of the localized fields created for the original field.
     """
+    compressed_fields = getattr(translation_opts, 'compress', ())
+    for field_name in compressed_fields:
+        if field_name not in translation_opts.fields:
+            raise ImproperlyConfigured(
+                'Compressed field "%s" of model "%s" is not translated.' % (
+                    field_name, model._meta.object_name))
     localized_fields = dict()
-    translation_opts = translator.get_options_for_model(model)
     for field_name in translation_opts.fields:
         localized_fields[field_name] = list()
-        for l in settings.LANGUAGES:
+        compressed = field_name in compressed_fields
+        for lang in translation_opts.field_languages[field_name]:
             # Create a dynamic translation field
             translation_field = create_translation_field(
-                model=model, field_name=field_name, lang=l[0])
+                model=model, field_name=field_name, lang=lang,
+                compressed=compressed)
             # Construct the name for the localized field
-            localized_field_name = build_localized_fieldname(field_name, l[0])
+            localized_field_name = build_localized_fieldname(field_name, lang)
             # Check if the model already has a field by that name
             if hasattr(model, localized_field_name):
                 raise ValueError(
@@ -60,27 +140,194 @@ def add_localized_fields(model):
             # django model fields and therefore adds them via add_to_class
             model.add_to_class(localized_field_name, translation_field)
             localized_fields[field_name].append(localized_field_name)
+            if compressed:
+                # Decompress values lazily
+                setattr(model, localized_field_name,
+                        CompressedValueDescriptor(localized_field_name))
     return localized_fields
 
 
+def add_localized_unique_together(model, translation_opts):
+    """
+    Mirrors every ``unique_together`` constraint of the model which contains
+    translated fields onto the localized fields of the language holding the
+    default value (usually the default language).
+
+    The other languages are optional and left empty by untranslated objects,
+    so the constraint isn't repeated for them.
+
+    Returns the original ``unique_together`` option.
+    """
+    opts = model._meta
+    orig_unique_together = opts.unique_together
+    unique_together = list(orig_unique_together)
+    for field_names in orig_unique_together:
+        translated = [f for f in field_names
+                      if f in translation_opts.field_languages]
+        if not translated:
+            continue
+        languages = [lang for lang in mt_settings.AVAILABLE_LANGUAGES
+                     if all(lang in translation_opts.field_languages[f]
+                            for f in translated)]
+        if not languages:
+            continue
+        lang = resolve_language(mt_settings.DEFAULT_LANGUAGE, languages)
+        unique_together.append(tuple(
+            build_localized_fieldname(f, lang) if f in translated else f
+            for f in field_names))
+    opts.unique_together = unique_together
+    return orig_unique_together
+
+
+def add_completeness_field(model, translation_opts):
+    """
+    Adds a field storing which localized fields of an object are filled as a
+    bitmap to the model and keeps it up to date on save.
+
+    Returns a dict mapping the names of the localized fields to their bit.
+    """
+    completeness_bits = dict()
+    for field_name in translation_opts.fields:
+        for localized_field_name in \
+                translation_opts.localized_fieldnames[field_name]:
+            completeness_bits[localized_field_name] = \
+                1 << len(completeness_bits)
+    # The bitmap is stored in a signed 64 bit integer
+    if len(completeness_bits) > 63:
+        raise ImproperlyConfigured(
+            'The completeness option supports at most 63 translation fields, '
+            'model "%s" has %d.' % (
+                model._meta.object_name, len(completeness_bits)))
+    if COMPLETENESS_FIELD in [f.name for f in model._meta.fields]:
+        raise ValueError(
+            "Error adding completeness field. Model '%s' already contains a "
+            "field named '%s'." % (
+                model._meta.object_name, COMPLETENESS_FIELD))
+    model.add_to_class(COMPLETENESS_FIELD, BigIntegerField(
+        default=0, editable=False))
+    signals.pre_save.connect(
+        update_derived_fields, weak=False,
+        dispatch_uid='modeltranslation.derived_fields')
+    return completeness_bits
+
+
+def add_effective_fields(model, translation_opts):
+    """
+    Adds fields materializing the effective value (the value resulting from
+    the fallback languages) of the fields listed in the ``effective_fields``
+    translation option to the model, one for each language of the field.
+    They are computed on save.
+
+    Returns a dict mapping the original fieldname to a dict mapping the
+    languages to the names of the effective fields.
+    """
+    effective_fieldnames = dict()
+    for field_name in getattr(translation_opts, 'effective_fields', ()):
+        if field_name not in translation_opts.fields:
+            raise ImproperlyConfigured(
+                'Effective field "%s" of model "%s" is not translated.' % (
+                    field_name, model._meta.object_name))
+        if isinstance(model._meta.get_field(field_name), FileField):
+            raise ImproperlyConfigured(
+                'Effective field "%s" of model "%s" is a file field, which is '
+                'not supported.' % (field_name, model._meta.object_name))
+        if field_name in getattr(translation_opts, 'compress', ()):
+            raise ImproperlyConfigured(
+                'Effective field "%s" of model "%s" is compressed, which is '
+                'not supported.' % (field_name, model._meta.object_name))
+        state_key = build_effective_state_key(field_name)
+        effective_fieldnames[field_name] = dict()
+        for lang in translation_opts.field_languages[field_name]:
+            effective_field = create_translation_field(
+                model=model, field_name=field_name, lang=lang)
+            effective_field_name = build_effective_fieldname(field_name, lang)
+            if effective_field_name in [f.name for f in model._meta.fields]:
+                raise ValueError(
+                    "Error adding effective field. Model '%s' already "
+                    "contains a field named '%s'." % (
+                        model._meta.object_name, effective_field_name))
+            # Effective values can be shared by several languages and are
+            # never edited directly
+            effective_field._unique = False
+            effective_field.editable = False
+            effective_field.default = NOT_PROVIDED
+            effective_field.db_column = None
+            effective_field.verbose_name = None
+            effective_field.name = effective_field_name
+            model.add_to_class(effective_field_name, effective_field)
+            effective_fieldnames[field_name][lang] = effective_field_name
+            # Track whether the effective values are up to date
+            setattr(model, effective_field_name, EffectiveStateDescriptor(
+                effective_field_name, state_key, True))
+            localized_field_name = build_localized_fieldname(field_name, lang)
+            setattr(model, localized_field_name, EffectiveStateDescriptor(
+                localized_field_name, state_key, False))
+    if effective_fieldnames:
+        signals.pre_save.connect(
+            update_derived_fields, weak=False,
+            dispatch_uid='modeltranslation.derived_fields')
+    return effective_fieldnames
+
+
+def remove_localized_fields(model, localized_fieldnames):
+    """
+    Reverts ``add_localized_fields`` by removing the given localized fields
+    from the model class.
+    """
+    for field_name, localized_names in localized_fieldnames.items():
+        remove_fields(model, localized_names)
+
+
+def remove_fields(model, field_names):
+    """
+    Removes the given fields added by modeltranslation from the model class.
+    """
+    opts = model._meta
+    for field_name in field_names:
+        field = opts.get_field(field_name)
+        # Fields compare equal by creation_counter, which translation
+        # fields share with the original field, so remove by identity.
+        opts.local_fields[:] = [
+            f for f in opts.local_fields if f is not field]
+        # Some fields also add attributes to the model class (e.g. the
+        # descriptor of a FileField)
+        for attr in (field_name, 'get_%s_display' % field_name):
+            if attr in model.__dict__:
+                delattr(model, attr)
+    delete_cache_fields(model)
+
+
 def add_manager(model):
     """
     Monkey patches the original model to use MultilingualManager instead of
     default manager (``objects``).
 
     If model has a custom manager, then merge it with MultilingualManager.
+
+    Returns the original class of the manager or ``None`` if the manager
+    was not patched.
     """
     if not hasattr(model, 'objects'):
-        return
+        return None
     current_manager = model.objects
     if isinstance(current_manager, MultilingualManager):
-        return
-    if current_manager.__class__ is Manager:
+        return None
+    manager_class = current_manager.__class__
+    if manager_class is Manager:
         current_manager.__class__ = MultilingualManager
     else:
-        class NewMultilingualManager(current_manager.__class__, MultilingualManager):
+        class NewMultilingualManager(manager_class, MultilingualManager):
             pass
         current_manager.__class__ = NewMultilingualManager
+    return manager_class
+
+
+def remove_manager(model, manager_class):
+    """
+    Reverts ``add_manager`` by restoring the original class of the manager.
+    """
+    if manager_class is not None:
+        model.objects.__class__ = manager_class
 
 
 def patch_constructor(model):
@@ -98,6 +345,26 @@ def patch_constructor(model):
     model.__init__ = new_init
 
 
+def get_class_attributes(model, names):
+    """
+    Returns a dict mapping the given attribute names to their values in the
+    model class dict (``None`` if not set directly on the class).
+    """
+    return dict((name, model.__dict__.get(name)) for name in names)
+
+
+def restore_class_attributes(model, attributes):
+    """
+    Restores class attributes of the model as returned by
+    ``get_class_attributes``.
+    """
+    for name, value in attributes.items():
+        if value is not None:
+            setattr(model, name, value)
+        elif name in model.__dict__:
+            delattr(model, name)
+
+
 #def translated_model_initialized(field_names, instance, **kwargs):
     #print "translated_model_initialized instance:", \
           #instance, ", field:", field_names
@@ -115,6 +382,36 @@ def patch_constructor(model):
         #setattr(sender, field_name, TranslationFieldDescriptor(field_name))
 
 
+def get_model_state(model, translation_opts):
+    """
+    Returns the state of the model class changed by registering it with the
+    given translation options.
+    """
+    manager_class = None
+    if hasattr(model, 'objects'):
+        manager_class = model.objects.__class__
+    return (list(model._meta.local_fields),
+            get_class_attributes(
+                model, ('__init__',) + tuple(translation_opts.fields)),
+            manager_class, model._meta.unique_together)
+
+
+def revert_model_state(model, state):
+    """
+    Restores the state of the model class returned by ``get_model_state``,
+    removing all fields added since.
+    """
+    local_fields, class_attributes, manager_class, unique_together = state
+    restore_class_attributes(model, class_attributes)
+    remove_manager(model, manager_class)
+    model._meta.unique_together = unique_together
+    remove_fields(model, [
+        f.name for f in model._meta.local_fields
+        if not [g for g in local_fields if g is f]])
+    for related_obj in model._meta.get_all_related_objects():
+        delete_cache_fields(related_obj.model)
+
+
 def delete_cache_fields(model):
     opts = model._meta
     try:
@@ -135,10 +432,29 @@ class Translator(object):
     """
     A Translator object encapsulates an instance of a translator. Models are
     registered with the Translator using the register() method.
+
+    The registry is never modified in place. Every change (made while holding
+    the lock) replaces it with an updated copy and increments ``_version``,
+    so it can be read without locking and caches derived from it can be
+    invalidated by comparing the version.
     """
     def __init__(self):
         # model_class class -> translation_opts instance
         self._registry = {}
+        self._version = 0
+        self._lock = threading.RLock()
+        # model_class class -> state replaced by register(), for unregister()
+        self._originals = {}
+        # (version, model_class class -> translation options inherited from
+        # registered parents)
+        self._inherited = (0, {})
+
+    def _set_registry(self, registry):
+        """
+        Publishes a new registry. Must be called while holding the lock.
+        """
+        self._registry = registry
+        self._version += 1
 
     def register(self, model_or_iterable, translation_opts, **options):
         """
@@ -149,6 +465,13 @@ class Translator(object):
         If a model is already registered for translation, this will raise
         AlreadyRegistered.
         """
+        self._lock.acquire()
+        try:
+            self._register(model_or_iterable, translation_opts, **options)
+        finally:
+            self._lock.release()
+
+    def _register(self, model_or_iterable, translation_opts, **options):
         if isinstance(model_or_iterable, ModelBase):
             model_or_iterable = [model_or_iterable]
 
@@ -168,77 +491,169 @@ class Translator(object):
                     "%sTranslationOptions" % model.__name__,
                     (translation_opts,), options)
 
-            # Store the translation class associated to the model
-            self._registry[model] = translation_opts
-
-            # Add the localized fields to the model and store the names of
-            # these fields in the model's translation options for faster lookup
-            # later on.
-            translation_opts.localized_fieldnames = add_localized_fields(model)
-
-            # Create a reverse dict mapping the localized_fieldnames to the
-            # original fieldname
-            rev_dict = dict()
-            for orig_name, loc_names in \
-                    translation_opts.localized_fieldnames.items():
-                for ln in loc_names:
-                    rev_dict[ln] = orig_name
-            translation_opts.localized_fieldnames_rev = rev_dict
-
-            # Delete all fields cache for related model (parent and children)
-            for related_obj in model._meta.get_all_related_objects():
-                delete_cache_fields(related_obj.model)
+            # Determine the languages every field is translated into
+            translation_opts.field_languages = get_field_languages(
+                model, translation_opts)
+            check_search_fields(model, translation_opts)
+
+            # Remember the state of the model changed below, to revert it if
+            # the registration fails
+            state = get_model_state(model, translation_opts)
+            try:
+                self._patch_model(model, translation_opts)
+            except:
+                self._originals.pop(model, None)
+                revert_model_state(model, state)
+                raise
 
-            # Set MultilingualManager
-            add_manager(model)
-
-            # Patch __init__ to rewrite fields
-            patch_constructor(model)
-
-            # Substitute original field with descriptor
-            model_fallback_values = getattr(
-                translation_opts, 'fallback_values', None)
-            model_fallback_languages = getattr(
-                translation_opts, 'fallback_languages', None)
-            for field_name in translation_opts.fields:
-                if model_fallback_values is None:
-                    field_fallback_value = None
-                elif isinstance(model_fallback_values, dict):
-                    field_fallback_value = model_fallback_values.get(
-                        field_name, None)
-                else:
-                    field_fallback_value = model_fallback_values
-                descriptor = TranslationFieldDescriptor(
-                    model._meta.get_field(field_name),
-                    fallback_value=field_fallback_value,
-                    fallback_languages=model_fallback_languages)
-                setattr(model, field_name, descriptor)
+            # Store the translation class associated to the model
+            registry = self._registry.copy()
+            registry[model] = translation_opts
+            self._set_registry(registry)
 
         #signals.pre_init.connect(translated_model_initializing, sender=model,
                                  #weak=False)
 
+    def _patch_model(self, model, translation_opts):
+        """
+        Adds the translation fields, derived fields, descriptors and manager
+        to the model.
+        """
+        # Add the localized fields to the model and store the names of
+        # these fields in the model's translation options for faster lookup
+        # later on.
+        translation_opts.localized_fieldnames = add_localized_fields(
+            model, translation_opts)
+
+        # Create a reverse dict mapping the localized_fieldnames to the
+        # original fieldname
+        rev_dict = dict()
+        for orig_name, loc_names in \
+                translation_opts.localized_fieldnames.items():
+            for ln in loc_names:
+                rev_dict[ln] = orig_name
+        translation_opts.localized_fieldnames_rev = rev_dict
+
+        # Add the bitmap of filled localized fields if requested
+        if getattr(translation_opts, 'completeness', False):
+            translation_opts.completeness_bits = add_completeness_field(
+                model, translation_opts)
+
+        # Add the fields materializing effective values
+        translation_opts.effective_fieldnames = add_effective_fields(
+            model, translation_opts)
+
+        # Delete all fields cache for related model (parent and children)
+        for related_obj in model._meta.get_all_related_objects():
+            delete_cache_fields(related_obj.model)
+
+        # Remember the class attributes which are replaced below
+        class_attributes = get_class_attributes(
+            model, ('__init__',) + tuple(translation_opts.fields))
+
+        # Set MultilingualManager
+        manager_class = add_manager(model)
+
+        # Patch __init__ to rewrite fields
+        patch_constructor(model)
+
+        # Translation fields inherit db_index and unique from the original
+        # field, but constraints spanning several fields must be added
+        unique_together = add_localized_unique_together(
+            model, translation_opts)
+
+        self._originals[model] = (
+            class_attributes, manager_class, unique_together)
+
+        # Substitute original field with descriptor
+        model_fallback_values = getattr(
+            translation_opts, 'fallback_values', None)
+        model_fallback_languages = getattr(
+            translation_opts, 'fallback_languages', None)
+        for field_name in translation_opts.fields:
+            if model_fallback_values is None:
+                field_fallback_value = None
+            elif isinstance(model_fallback_values, dict):
+                field_fallback_value = model_fallback_values.get(
+                    field_name, None)
+            else:
+                field_fallback_value = model_fallback_values
+            descriptor_kwargs = dict(
+                fallback_value=field_fallback_value,
+                fallback_languages=model_fallback_languages,
+                languages=translation_opts.field_languages[field_name])
+            if field_name in translation_opts.effective_fieldnames:
+                descriptor = EffectiveFieldDescriptor(
+                    model._meta.get_field(field_name),
+                    translation_opts.effective_fieldnames[field_name],
+                    **descriptor_kwargs)
+            else:
+                descriptor = TranslationFieldDescriptor(
+                    model._meta.get_field(field_name), **descriptor_kwargs)
+            setattr(model, field_name, descriptor)
+
+        # Create the full-text indexes of the search fields with the table
+        if getattr(translation_opts, 'search_fields', ()):
+            signals.post_syncdb.connect(
+                create_search_indexes, weak=False,
+                dispatch_uid='modeltranslation.search_indexes')
+
     def unregister(self, model_or_iterable):
         """
         Unregisters the given model(s).
 
         If a model isn't already registered, this will raise NotRegistered.
         """
+        self._lock.acquire()
+        try:
+            self._unregister(model_or_iterable)
+        finally:
+            self._lock.release()
+
+    def _unregister(self, model_or_iterable):
         if isinstance(model_or_iterable, ModelBase):
             model_or_iterable = [model_or_iterable]
         for model in model_or_iterable:
             if model not in self._registry:
                 raise NotRegistered('The model "%s" is not registered for '
                                     'translation' % model.__name__)
-            del self._registry[model]
+            registry = self._registry.copy()
+            translation_opts = registry.pop(model)
+            self._set_registry(registry)
+            class_attributes, manager_class, unique_together = \
+                self._originals.pop(model)
+
+            # Revert everything register() did to the model
+            restore_class_attributes(model, class_attributes)
+            remove_manager(model, manager_class)
+            model._meta.unique_together = unique_together
+            remove_localized_fields(model, translation_opts.localized_fieldnames)
+            if getattr(translation_opts, 'completeness_bits', None):
+                remove_fields(model, [COMPLETENESS_FIELD])
+            for effective_names in \
+                    translation_opts.effective_fieldnames.values():
+                remove_fields(model, effective_names.values())
+            for related_obj in model._meta.get_all_related_objects():
+                delete_cache_fields(related_obj.model)
 
     def get_options_for_model(self, model):
         """
         Returns the translation options for the given ``model``. If the
         ``model`` is not registered a ``NotRegistered`` exception is raised.
         """
+        # Read the version first, it's incremented after a new registry was
+        # published, so the cache can't end up with outdated options.
+        version = self._version
+        registry = self._registry
         try:
-            return self._registry[model]
+            return registry[model]
         except KeyError:
+            cache_version, inherited = self._inherited
+            if cache_version != version:
+                inherited = {}
+                self._inherited = (version, inherited)
+            elif model in inherited:
+                return inherited[model]
             # Try to find a localized parent model and build a dedicated
             # translation options class with the parent info.
             # Useful when a ModelB inherits from ModelA and only ModelA fields
@@ -246,25 +661,40 @@ class Translator(object):
             fields = set()
             localized_fieldnames = {}
             localized_fieldnames_rev = {}
+            field_languages = {}
+            completeness_bits = {}
+            effective_fieldnames = {}
+            compress = set()
             for parent in model._meta.parents.keys():
-                if parent in self._registry:
-                    trans_opts = self._registry[parent]
+                if parent in registry:
+                    trans_opts = registry[parent]
                     fields.update(trans_opts.fields)
                     localized_fieldnames.update(
                         trans_opts.localized_fieldnames)
                     localized_fieldnames_rev.update(
                         trans_opts.localized_fieldnames_rev)
+                    field_languages.update(trans_opts.field_languages)
+                    completeness_bits.update(
+                        getattr(trans_opts, 'completeness_bits', {}))
+                    effective_fieldnames.update(
+                        trans_opts.effective_fieldnames)
+                    compress.update(getattr(trans_opts, 'compress', ()))
             if fields and localized_fieldnames and localized_fieldnames_rev:
                 options = {
                     '__module__': __name__,
                     'fields': tuple(fields),
                     'localized_fieldnames': localized_fieldnames,
-                    'localized_fieldnames_rev': localized_fieldnames_rev
+                    'localized_fieldnames_rev': localized_fieldnames_rev,
+                    'field_languages': field_languages,
+                    'completeness_bits': completeness_bits,
+                    'effective_fieldnames': effective_fieldnames,
+                    'compress': tuple(compress)
                 }
                 translation_opts = type(
                     "%sTranslation" % model.__name__,
                     (TranslationOptions,), options)
                 # delete_cache_fields(model)
+                inherited[model] = translation_opts
                 return translation_opts
             raise NotRegistered('The model "%s" is not registered for '
                                 'translation' % model.__name__)
@@ -31,6 +31,10 @@ def build_localized_fieldname(field_name, lang):
     return str('%s_%s' % (field_name, lang.replace('-', '_')))
 
 
+def build_effective_fieldname(field_name, lang):
+    return build_localized_fieldname('%s_effective' % field_name, lang)
+
+
 def _build_localized_verbose_name(verbose_name, lang):
     return u'%s [%s]' % (force_unicode(verbose_name), lang)
 build_localized_verbose_name = lazy(_build_localized_verbose_name, unicode)
@@ -99,3 +103,29 @@ def resolution_order(lang, override=None):
     fallback_def = override.get('default', settings.FALLBACK_LANGUAGES['default'])
     order = (lang,) + fallback_for_lang + fallback_def
     return tuple(unique(order))
+
+
+def resolve_language(lang, languages, override=None):
+    """
+    Return the language out of ``languages`` which holds the value of a field
+    for parameter language. That is the parameter language itself if the field
+    is translated into it, otherwise the first matching fallback language,
+    otherwise the default language or simply the first of ``languages``.
+    """
+    if lang in languages:
+        return lang
+    for fallback_lang in resolution_order(lang, override):
+        if fallback_lang in languages:
+            return fallback_lang
+    if settings.DEFAULT_LANGUAGE in languages:
+        return settings.DEFAULT_LANGUAGE
+    return languages[0]
+
+
+def get_search_config(lang):
+    """
+    Return the PostgreSQL text search configuration for parameter language.
+    """
+    if lang in settings.SEARCH_CONFIGS:
+        return settings.SEARCH_CONFIGS[lang]
+    return settings.SEARCH_CONFIGS.get(lang.split('-')[0], 'simple')